@@ -1,3 +1,4 @@
+import hashlib
 import numpy as np
 
 # Define Identifiers
@@ -37,12 +38,12 @@ D_I[1, 4] = 1  # d2 starts with i5
 D_I[2, 3] = 1  # d3 starts with i4
 
 # Function to compute all valid I-O-I-[O/Dn] sequences starting from a Design Node (Dn)
-def compute_sequences_from_dn(start_dn_index):
+def compute_sequences_from_dn(start_dn_index, D_I=D_I, T_Unified=T_Unified):
     # Step 1: Get initial set of Intentions from the Design Node
     I_valid = np.copy(D_I[start_dn_index, :].reshape(1, -1))  # Shape (1, num_intentions)
 
     # Step 2: Propagate through the transition matrix iteratively
-    max_iterations = num_intentions  # Prevent infinite loops
+    max_iterations = T_Unified.shape[0]  # Prevent infinite loops
     iteration = 0
     while iteration < max_iterations:
         new_I_valid = np.dot(I_valid, T_Unified)  # Apply transitions
@@ -53,13 +54,86 @@ def compute_sequences_from_dn(start_dn_index):
 
     return I_valid
 
-# Compute all sequences from each Design Node
-all_sequences = {}
-for dn_index in range(num_design_nodes):
-    all_sequences[design_nodes[dn_index]] = compute_sequences_from_dn(dn_index)
+# Sparse form of a transition matrix: CSR (indptr, indices), memory grows with the edge count
+def build_successors(T_Unified):
+    rows, cols = np.nonzero(T_Unified)
+    indptr = np.zeros(T_Unified.shape[0] + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=T_Unified.shape[0]), out=indptr[1:])
+    return indptr, cols.astype(np.int64)
+
+# Boolean BFS over the successor lists, each round visits only newly reached intentions
+def reachable_intentions(start, successors):
+    indptr, indices = successors
+    reached = np.asarray(start, dtype=bool).copy()
+    frontier = np.flatnonzero(reached)
+    while frontier.size:
+        # Gather the successors of the whole frontier in one go
+        counts = indptr[frontier + 1] - indptr[frontier]
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        candidates = indices[np.repeat(indptr[frontier], counts) + offsets]
+        frontier = np.unique(candidates[~reached[candidates]])
+        reached[frontier] = True
+    return reached
+
+# Same question as compute_sequences_from_dn, answered as a boolean (1, num_intentions) row
+def reachable_from_dn(start_dn_index, D_I=D_I, successors=None):
+    if successors is None:
+        successors = build_successors(T_Unified)
+    return reachable_intentions(D_I[start_dn_index, :] > 0, successors).reshape(1, -1)
+
+# Batched boolean propagation: every row of start_rows spreads through T_Unified at once.
+# The rows are bit-packed per intention, so each round is an OR-AND semiring product
+# over the edge list that costs edges x rows / 8 bytes of bitwise ORs
+def reachable_rows(start_rows, T_Unified):
+    start = np.asarray(start_rows) != 0
+    dst, src = np.nonzero(T_Unified.T != 0)  # edges grouped by target intention
+    if dst.size == 0:
+        return start
+    targets, bounds = np.unique(dst, return_index=True)
+    reached = np.ascontiguousarray(np.packbits(start, axis=0).T)  # (num_intentions, rows / 8)
+    frontier = reached
+    while frontier.any():
+        new = np.zeros_like(reached)
+        new[targets] = np.bitwise_or.reduceat(frontier[src], bounds, axis=0)
+        new &= ~reached
+        reached |= new
+        frontier = new
+    return np.unpackbits(reached.T, axis=0, count=start.shape[0]).astype(bool)
+
+# Reflexive transitive closure of T_Unified, recomputed only when its edge set changes
+_closure_cache = {}
+
+def _edge_key(T_Unified):
+    edges = np.packbits(T_Unified != 0)
+    return (T_Unified.shape, hashlib.sha1(edges.tobytes()).digest())
+
+def transitive_closure(T_Unified):
+    key = _edge_key(T_Unified)
+    if _closure_cache.get("key") != key:
+        _closure_cache["closure"] = reachable_rows(np.eye(T_Unified.shape[0], dtype=bool), T_Unified)
+        _closure_cache["key"] = key
+    return _closure_cache["closure"]
+
+# OR-AND product of start rows with a closure: each row ORs the closure rows of its
+# nonzero columns, all rows in one reduceat over the nonzero entries
+def boolean_product(start_rows, closure):
+    rows, cols = np.nonzero(start_rows)
+    table = np.zeros((start_rows.shape[0], closure.shape[1]), dtype=bool)
+    if rows.size:
+        sources, bounds = np.unique(rows, return_index=True)
+        table[sources] = np.logical_or.reduceat(closure[cols], bounds, axis=0)
+    return table
+
+# Design-node-by-intention reachability table for every Design Node in one pass:
+# every row of D_I propagated at once, or one product with the closure when
+# transitive_closure already has it cached for this T_Unified
+def reachability_table(D_I=D_I, T_Unified=T_Unified):
+    if _closure_cache.get("key") == _edge_key(T_Unified):
+        return boolean_product(D_I, _closure_cache["closure"])
+    return reachable_rows(D_I, T_Unified)
 
 # Convert to Readable Output
-def print_cpux_sequences():
+def print_cpux_sequences(all_sequences):
     for dn, seq_matrix in all_sequences.items():
         print(f"\nStarting from {dn}:")
         for i in range(num_intentions):
@@ -67,4 +141,11 @@ def print_cpux_sequences():
                 if seq_matrix[0, j] > 0:  # Valid transition exists
                     print(f"  {dn} → {intentions[i]} → {intentions[j]}")
 
-print_cpux_sequences()
+if __name__ == "__main__":
+    # Compute all sequences from every Design Node at once
+    table = reachability_table()
+    all_sequences = {}
+    for dn_index in range(num_design_nodes):
+        all_sequences[design_nodes[dn_index]] = table[dn_index:dn_index + 1]
+
+    print_cpux_sequences(all_sequences)
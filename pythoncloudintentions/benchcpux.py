@@ -0,0 +1,625 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+import tracemalloc
+
+import numpy as np
+
+from genwithpnr import CPUXGenerator, CPUXGeneratorWithPnR, CPUXStore, PnRSet, PromptInterner
+from cpuxcompiler import compile_cpuxs, generator_from_registries
+from intentionflow import AsyncIntentionRuntime, IntentionFlowEngine, columns_to_pnrs, pnrs_to_columns
+
+
+def _random_trios(n_trios: int, n_i: int, n_o: int, n_dn: int, seed: int = 0):
+    """Random mix of i-o-i and i-dn-i trios over the given node counts"""
+    rnd = random.Random(seed)
+    trios = []
+    for _ in range(n_trios):
+        if rnd.random() < 0.7:
+            trios.append(("ioi", rnd.randrange(n_i), rnd.randrange(n_o), rnd.randrange(n_i)))
+        else:
+            trios.append(("idni", rnd.randrange(n_i), rnd.randrange(n_dn), rnd.randrange(n_i)))
+    return trios
+
+
+def _generator(n_i: int, n_o: int, n_dn: int, sparse: bool) -> CPUXGenerator:
+    return CPUXGenerator([f"i{k}" for k in range(n_i)],
+                         [f"o{k}" for k in range(n_o)],
+                         [f"dn{k}" for k in range(n_dn)],
+                         sparse=sparse)
+
+
+def _pnr_generator(n_i: int, n_o: int, n_dn: int, n_trios: int, n_prompts: int = 8,
+                   configured: float = 0.3, seed: int = 0) -> CPUXGeneratorWithPnR:
+    """Sparse PnR generator with random gatekeeper/flowin/flowout sets on a share of its nodes"""
+    rnd = random.Random(seed)
+    generator = CPUXGeneratorWithPnR([f"i{k}" for k in range(n_i)],
+                                     [f"o{k}" for k in range(n_o)],
+                                     [f"dn{k}" for k in range(n_dn)],
+                                     sparse=True)
+    generator.add_trios(_random_trios(n_trios, n_i, n_o, n_dn, seed))
+    prompts = [f"p{k}" for k in range(n_prompts)]
+    
+    def random_set(size):
+        return {prompt: (rnd.choice(["on", "off"]), rnd.choice("YNU"))
+                for prompt in rnd.sample(prompts, size)}
+    
+    names = generator.intentions + generator.objects + generator.design_nodes
+    for name in rnd.sample(names, int(len(names) * configured)):
+        generator.add_component_pnr(name, gatekeeper=random_set(rnd.randint(0, 2)),
+                                    flowin=random_set(rnd.randint(0, 2)),
+                                    flowout=random_set(rnd.randint(0, 2)))
+    return generator
+
+
+def _load_one_by_one(generator: CPUXGenerator, trios, rebuild: bool = False):
+    for kind, i1_idx, mid_idx, i2_idx in trios:
+        if kind == "ioi":
+            generator.add_ioi_trio(i1_idx, mid_idx, i2_idx)
+        else:
+            generator.add_idni_trio(i1_idx, mid_idx, i2_idx)
+        if rebuild:
+            # What every insertion used to cost
+            generator._update_transition_matrix()
+
+
+def bench_trios(sizes=(1_000, 10_000, 100_000), n_i=1500, n_o=1000, n_dn=500):
+    """Model load time against trio count"""
+    print(f"Trio loading, {n_i} intentions / {n_o} objects / {n_dn} design nodes")
+    print(f"{'trios':>8} {'rebuild':>10} {'dense':>10} {'sparse':>10} {'bulk dense':>11} {'bulk sparse':>12}")
+    for n_trios in sizes:
+        trios = _random_trios(n_trios, n_i, n_o, n_dn)
+        timings = []
+        # Full rebuild per trio is quadratic in the node count, so only sample it
+        sample = trios[:min(n_trios, 200)]
+        start = time.perf_counter()
+        _load_one_by_one(_generator(n_i, n_o, n_dn, False), sample, rebuild=True)
+        timings.append((time.perf_counter() - start) * n_trios / len(sample))
+        for sparse in (False, True):
+            generator = _generator(n_i, n_o, n_dn, sparse)
+            start = time.perf_counter()
+            _load_one_by_one(generator, trios)
+            timings.append(time.perf_counter() - start)
+        for sparse in (False, True):
+            generator = _generator(n_i, n_o, n_dn, sparse)
+            start = time.perf_counter()
+            generator.add_trios(trios)
+            timings.append(time.perf_counter() - start)
+        print(f"{n_trios:>8} " + " ".join(f"{t:>10.3f}s" for t in timings)
+              + ("  (rebuild extrapolated)" if n_trios > 200 else ""))
+
+
+def _legacy_row_scan(generator: CPUXGenerator, idx: int):
+    """The old expansion step: test every node in the graph as a successor"""
+    return [j for j in range(generator.n_total) if generator.has_transition(idx, j)]
+
+
+def bench_expansion(n_i=6000, n_o=4000, n_dn=2000, n_trios=8_000, max_length=6, sample=50):
+    """Successor-index path expansion against the old full row scan"""
+    generator = _generator(n_i, n_o, n_dn, sparse=True)
+    generator.add_trios(_random_trios(n_trios, n_i, n_o, n_dn))
+    print(f"Path expansion on {generator.n_total} nodes, {n_trios} trios, max_length={max_length}")
+    
+    successors = generator.successor_index()
+    frontier = [([k], True, None, None) for k in range(generator.n_dn, generator.n_total)]
+    expansions = 0
+    start = time.perf_counter()
+    for _ in range(max_length - 1):
+        expansions += len(frontier)
+        frontier = [entry[:4] for entry in generator._expand_paths(frontier, successors)]
+    engine_time = time.perf_counter() - start
+    
+    nodes = random.Random(1).sample(range(generator.n_dn, generator.n_total), sample)
+    start = time.perf_counter()
+    for idx in nodes:
+        assert _legacy_row_scan(generator, idx) == successors[idx]
+    scan_time = (time.perf_counter() - start) / sample * expansions
+    
+    print(f"  {expansions} path expansions")
+    print(f"  successor index: {engine_time:.3f}s")
+    print(f"  row scan:        {scan_time:.3f}s (extrapolated from {sample} expansions)")
+
+
+def bench_dedupe(n_i=6000, n_o=4000, n_dn=2000, n_trios=8_000, max_length=6,
+                 sizes=(1_000, 5_000, 20_000)):
+    """Hashed CPUX de-duplication against list membership"""
+    generator = _generator(n_i, n_o, n_dn, sparse=True)
+    generator.add_trios(_random_trios(n_trios, n_i, n_o, n_dn))
+    start = time.perf_counter()
+    paths = generator.get_valid_paths(max_length)
+    print(f"get_valid_paths on {generator.n_total} nodes: {len(paths)} CPUXs in "
+          f"{time.perf_counter() - start:.3f}s")
+    
+    print(f"{'CPUXs':>8} {'list':>10} {'set':>10}")
+    for size in sizes:
+        sample = paths[:size]
+        start = time.perf_counter()
+        emitted = []
+        for path in sample:
+            if path not in emitted:
+                emitted.append(path)
+        list_time = time.perf_counter() - start
+        start = time.perf_counter()
+        emitted, seen = [], set()
+        for path in sample:
+            key = tuple(path)
+            if key not in seen:
+                seen.add(key)
+                emitted.append(path)
+        set_time = time.perf_counter() - start
+        print(f"{size:>8} {list_time:>9.3f}s {set_time:>9.3f}s")
+
+
+def bench_pruning(n_i=3000, n_o=2000, n_dn=1000, n_trios=4_000, max_length=7):
+    """Feasible CPUX search with and without PnR pruning during expansion"""
+    generator = _pnr_generator(n_i, n_o, n_dn, n_trios)
+    print(f"Feasible CPUXs on {generator.n_total} nodes, {n_trios} trios, max_length={max_length}")
+    for prune in (False, True):
+        start = time.perf_counter()
+        feasible = generator.get_feasible_cpuxs(max_length, prune=prune)
+        print(f"  prune={prune!s:<5} {len(feasible)} feasible in {time.perf_counter() - start:.3f}s")
+    stats = generator.pnr_cache_stats()
+    print(f"  unpruned search: {stats['carried_hops']} PnR states carried from parent paths; "
+          f"prefix cache: {stats['nodes']} nodes, hit rate {stats['hit_rate']:.1%}")
+
+
+def bench_synctest(n_prompts=16, set_size=6, n_pairs=20_000, rounds=20):
+    """Dict-based PnRSet.synctest against the interned bitset form"""
+    rnd = random.Random(0)
+    prompts = [f"p{k}" for k in range(n_prompts)]
+    interner = PromptInterner()
+    pairs = []
+    for _ in range(n_pairs):
+        a, b = (PnRSet({prompt: ("r", rnd.choice("YNU")) for prompt in rnd.sample(prompts, set_size)})
+                for _ in range(2))
+        pairs.append((a, b, a.to_compact(interner), b.to_compact(interner)))
+    
+    start = time.perf_counter()
+    for _ in range(rounds):
+        dict_results = [a.synctest(b) for a, b, _, _ in pairs]
+    dict_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(rounds):
+        compact_results = [ca.synctest(cb) for _, _, ca, cb in pairs]
+    compact_time = time.perf_counter() - start
+    assert dict_results == compact_results
+    
+    calls = n_pairs * rounds
+    print(f"synctest on {set_size}-prompt sets, {calls} calls")
+    print(f"  dict:    {dict_time / calls * 1e9:.0f} ns/call")
+    print(f"  bitsets: {compact_time / calls * 1e9:.0f} ns/call")
+
+
+def bench_batch(n_i=3000, n_o=2000, n_dn=1000, n_trios=4_000, max_length=7, configured=0.6):
+    """Vectorized feasibility re-check against the per-path check after a PnR change"""
+    generator = _pnr_generator(n_i, n_o, n_dn, n_trios, configured=configured)
+    cpuxs = generator.get_valid_paths(max_length)
+    encoded = generator.encode_paths(cpuxs)
+    print(f"Re-checking {len(cpuxs)} CPUXs on {generator.n_total} nodes")
+    
+    # Any PnR change invalidates the cached states and arrays
+    generator.add_component_pnr(generator.intentions[0], gatekeeper={"p0": ("on", "Y")})
+    start = time.perf_counter()
+    per_path = np.array([generator.is_feasible_path(cpux)[0] for cpux in cpuxs])
+    path_time = time.perf_counter() - start
+    start = time.perf_counter()
+    feasible, _, _ = generator.check_paths_batch(encoded)
+    batch_time = time.perf_counter() - start
+    assert (feasible == per_path).all()
+    
+    print(f"  {int(feasible.sum())} feasible")
+    print(f"  is_feasible_path:  {path_time:.3f}s")
+    print(f"  check_paths_batch: {batch_time:.3f}s")
+
+
+def _random_intention_graph(n_intentions: int, n_design_nodes: int, out_degree: int, seed: int = 0):
+    """Random D_I and T_Unified matrices in the layout CPUXMatrix.py uses"""
+    rng = np.random.default_rng(seed)
+    T_Unified = np.zeros((n_intentions, n_intentions))
+    rows = np.repeat(np.arange(n_intentions), out_degree)
+    T_Unified[rows, rng.integers(0, n_intentions, rows.size)] = 1
+    D_I = np.zeros((n_design_nodes, n_intentions))
+    D_I[np.arange(n_design_nodes), rng.integers(0, n_intentions, n_design_nodes)] = 1
+    return D_I, T_Unified
+
+
+def bench_reachability(sizes=(500, 1_000, 2_000), n_design_nodes=5, out_degree=1):
+    """Boolean frontier BFS against the accumulating float dot-product loop in CPUXMatrix.py"""
+    from CPUXMatrix import build_successors, compute_sequences_from_dn, reachable_from_dn
+    
+    print(f"Design node reachability, {n_design_nodes} design nodes, out-degree {out_degree}")
+    print(f"{'intentions':>10} {'dot loop':>10} {'BFS':>10}")
+    for n_intentions in sizes:
+        D_I, T_Unified = _random_intention_graph(n_intentions, n_design_nodes, out_degree)
+        start = time.perf_counter()
+        with np.errstate(over="ignore", invalid="ignore"):
+            legacy = [compute_sequences_from_dn(dn, D_I, T_Unified) for dn in range(n_design_nodes)]
+        legacy_time = time.perf_counter() - start
+        start = time.perf_counter()
+        successors = build_successors(T_Unified)
+        reached = [reachable_from_dn(dn, D_I, successors) for dn in range(n_design_nodes)]
+        bfs_time = time.perf_counter() - start
+        for old, new in zip(legacy, reached):
+            # The float counts overflow to inf/nan on cyclic graphs; compare where they are finite
+            finite = np.isfinite(old)
+            assert ((old > 0) == new)[finite].all()
+        print(f"{n_intentions:>10} {legacy_time:>9.3f}s {bfs_time:>9.3f}s")
+
+
+def bench_reachability_table(sizes=(1_000, 2_000, 4_000), n_design_nodes=500, out_degree=2):
+    """All-design-node reachability: per-node BFS, one batched pass, and the product with a cached closure"""
+    from CPUXMatrix import (build_successors, reachability_table, reachable_from_dn, reachable_rows,
+                            transitive_closure)
+    
+    print(f"Reachability table, {n_design_nodes} design nodes, out-degree {out_degree}")
+    print(f"{'intentions':>10} {'per-DN BFS':>11} {'batched':>10} {'table':>10} {'closure':>10} {'cached':>10}")
+    for n_intentions in sizes:
+        D_I, T_Unified = _random_intention_graph(n_intentions, n_design_nodes, out_degree)
+        start = time.perf_counter()
+        successors = build_successors(T_Unified)
+        per_dn = np.vstack([reachable_from_dn(dn, D_I, successors) for dn in range(n_design_nodes)])
+        bfs_time = time.perf_counter() - start
+        start = time.perf_counter()
+        batched = reachable_rows(D_I, T_Unified)
+        batched_time = time.perf_counter() - start
+        timings = []
+        for prepare in (None, lambda: transitive_closure(T_Unified)):
+            if prepare is not None:
+                start = time.perf_counter()
+                prepare()
+                timings.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            table = reachability_table(D_I, T_Unified)
+            timings.append(time.perf_counter() - start)
+            assert (per_dn == batched).all() and (per_dn == table).all()
+        print(f"{n_intentions:>10} {bfs_time:>10.3f}s {batched_time:>9.3f}s "
+              f"{timings[0]:>9.3f}s {timings[1]:>9.3f}s {timings[2]:>9.3f}s")
+
+
+def bench_reach_index(n_i=6000, n_o=4000, n_dn=2000, n_trios=8_000, queries=100_000, max_hops=6):
+    """Reachability index build, query and incremental update times"""
+    generator = _generator(n_i, n_o, n_dn, sparse=True)
+    generator.add_trios(_random_trios(n_trios, n_i, n_o, n_dn))
+    print(f"Reachability index on {generator.n_total} nodes, {n_trios} trios")
+    
+    start = time.perf_counter()
+    index = generator.reachability_index()
+    print(f"  build closure:       {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    index.can_reach(0, 0, max_hops)
+    print(f"  build {max_hops} hop levels:  {time.perf_counter() - start:.3f}s")
+    
+    rnd = random.Random(2)
+    pairs = [(rnd.randrange(generator.n_total), rnd.randrange(generator.n_total)) for _ in range(queries)]
+    for bound in (None, max_hops):
+        start = time.perf_counter()
+        hits = sum(index.can_reach(src, dst, bound) for src, dst in pairs)
+        elapsed = time.perf_counter() - start
+        print(f"  can_reach max_hops={bound}: {elapsed / queries * 1e6:.2f} us/query ({hits} reachable)")
+    
+    for n_new in (10, 100, 10_000):
+        start = time.perf_counter()
+        for _ in range(n_new):
+            generator.add_ioi_trio(rnd.randrange(n_i), rnd.randrange(n_o), rnd.randrange(n_i))
+        inserted = time.perf_counter() - start
+        start = time.perf_counter()
+        index.can_reach(0, 0)
+        print(f"  {n_new:>6} new trios:     {inserted / n_new * 1e6:.2f} us/trio, "
+              f"next query {time.perf_counter() - start:.3f}s")
+
+
+def bench_count(n_i=6000, n_o=4000, n_dn=2000, n_trios=8_000, lengths=(4, 6, 8)):
+    """Path counting by frontier products against full enumeration"""
+    generator = _generator(n_i, n_o, n_dn, sparse=True)
+    generator.add_trios(_random_trios(n_trios, n_i, n_o, n_dn))
+    print(f"Counting CPUXs on {generator.n_total} nodes, {n_trios} trios")
+    print(f"{'max_length':>10} {'CPUXs':>10} {'count':>10} {'enumerate':>10}")
+    for max_length in lengths:
+        start = time.perf_counter()
+        counts = generator.count_valid_paths(max_length)
+        count_time = time.perf_counter() - start
+        total = sum(sum(by_length.values()) for by_length in counts.values())
+        start = time.perf_counter()
+        enumerated = sum(1 for _ in generator.iter_valid_paths(max_length))
+        enumerate_time = time.perf_counter() - start
+        assert total == enumerated
+        print(f"{max_length:>10} {total:>10} {count_time:>9.3f}s {enumerate_time:>9.3f}s")
+
+
+def bench_revisits(n_i=40, n_o=30, n_dn=10, n_trios=80, max_length=13):
+    """Enumeration cost of the revisit-limiting modes on a small, strongly cyclic graph"""
+    generator = _generator(n_i, n_o, n_dn, sparse=True)
+    generator.add_trios(_random_trios(n_trios, n_i, n_o, n_dn))
+    print(f"Revisit modes on {generator.n_total} nodes, {n_trios} trios, max_length={max_length}")
+    for label, options in (("all walks", {}),
+                           ("max_visits=2", {"max_visits": 2}),
+                           ("simple paths", {"max_visits": 1}),
+                           ("collapse_cycles", {"collapse_cycles": True})):
+        start = time.perf_counter()
+        total = sum(1 for _ in generator.iter_valid_paths(max_length, **options))
+        print(f"  {label:<16} {total:>9} CPUXs in {time.perf_counter() - start:.3f}s")
+
+
+def bench_parallel(n_i=40, n_o=30, n_dn=10, n_trios=100, max_length=9, workers=(1, 2, 4)):
+    """Serial vs process-pool enumeration, structural and PnR-pruned"""
+    generator = _pnr_generator(n_i, n_o, n_dn, n_trios)
+    print(f"Parallel enumeration on {generator.n_total} nodes, {n_trios} trios, "
+          f"max_length={max_length}, {os.cpu_count()} CPUs")
+    for label, run in (("valid", generator.get_valid_paths),
+                       ("feasible", lambda max_length, **kw: [
+                           (cpux, final_pnr.pnrs) for cpux, final_pnr in
+                           generator.get_feasible_cpuxs(max_length, prune=True, **kw)])):
+        start = time.perf_counter()
+        serial = run(max_length)
+        print(f"  {label:<9} serial     {len(serial):>8} CPUXs in {time.perf_counter() - start:.3f}s")
+        for count in workers:
+            start = time.perf_counter()
+            parallel = run(max_length, workers=count, split_depth=2)
+            same = parallel == serial
+            print(f"  {label:<9} workers={count:<2} {len(parallel):>8} CPUXs in "
+                  f"{time.perf_counter() - start:.3f}s, identical: {same}")
+            assert same
+
+
+def _hub_generator(n_i=40, n_o=20, n_dn=5, n_trios=30, hub_fanout=12, seed=0) -> CPUXGeneratorWithPnR:
+    """PnR generator where object o0 reflects into hub_fanout intentions, so one subtree dominates"""
+    rnd = random.Random(seed)
+    generator = _pnr_generator(n_i, n_o, n_dn, n_trios, seed=seed)
+    generator.add_trios(("ioi", rnd.randrange(n_i), 0, rnd.randrange(n_i)) for _ in range(hub_fanout))
+    return generator
+
+
+def bench_stealing(max_length=10, workers=4):
+    """Static chunks vs the work-stealing schedule on a graph with one hub object, both checked against serial"""
+    generator = _hub_generator()
+    print(f"Scheduling on a hub graph of {generator.n_total} nodes, max_length={max_length}, "
+          f"workers={workers}, {os.cpu_count()} CPUs")
+    for label, run in (("valid", generator.get_valid_paths),
+                       ("feasible", lambda max_length, **kw: [
+                           (cpux, final_pnr.pnrs) for cpux, final_pnr in
+                           generator.get_feasible_cpuxs(max_length, prune=True, **kw)])):
+        serial = run(max_length)
+        for steal in (False, True):
+            start = time.perf_counter()
+            result = run(max_length, workers=workers, steal=steal)
+            elapsed = time.perf_counter() - start
+            assert result == serial
+            total = len(result)
+            stats = generator.parallel_stats().values()
+            paths = [worker["paths"] for worker in stats]
+            idle = sum(worker["idle"] for worker in stats)
+            print(f"  {label:<9} {'stealing' if steal else 'static':<9} {total:>8} CPUXs in {elapsed:.3f}s, "
+                  f"paths explored per worker {min(paths)}-{max(paths)}, total idle {idle:.3f}s")
+
+
+def bench_dfs(n_i=40, n_o=30, n_dn=10, n_trios=100, max_length=9):
+    """Peak memory and time of the BFS, depth-first and iterative-deepening search orders"""
+    generator = _generator(n_i, n_o, n_dn, sparse=True)
+    generator.add_trios(_random_trios(n_trios, n_i, n_o, n_dn))
+    print(f"Search orders on {generator.n_total} nodes, {n_trios} trios, max_length={max_length}")
+    for order in ("bfs", "dfs", "deepening"):
+        tracemalloc.start()
+        start = time.perf_counter()
+        total = sum(1 for _ in generator.iter_valid_paths(max_length, order=order))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {order:<10} {total:>8} CPUXs in {elapsed:.3f}s, peak {peak / 2 ** 20:.2f} MiB")
+
+
+def bench_store(n_i=40, n_o=30, n_dn=10, n_trios=100, max_length=9):
+    """Memory held by CPUXs as lists of names vs a CPUXStore, and store filtering time"""
+    generator = _pnr_generator(n_i, n_o, n_dn, n_trios)
+    print(f"Result storage on {generator.n_total} nodes, {n_trios} trios, max_length={max_length}")
+    for label, build in (("lists", lambda: generator.get_valid_paths(max_length)),
+                         ("CPUXStore", lambda: CPUXStore.from_index_paths(
+                             generator, (path for path, _ in generator._iter_index_paths(max_length)))),
+                         ("categorized lists", lambda: generator.get_categorized_cpuxs(max_length, prune=True)),
+                         ("categorized stores", lambda: generator.get_categorized_cpuxs(max_length,
+                                                                                        as_store=True))):
+        tracemalloc.start()
+        start = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - start
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {label:<19} built in {elapsed:.3f}s, holding {held / 2 ** 20:.2f} MiB")
+        if isinstance(result, CPUXStore):
+            start = time.perf_counter()
+            with_dn = result.filter_by_type("DN")
+            print(f"  {'':<19} {len(with_dn)} of {len(result)} contain a DN, "
+                  f"filtered in {time.perf_counter() - start:.4f}s")
+        del result
+
+
+def bench_types(n_i=40, n_o=30, n_dn=10, n_trios=100, max_length=9):
+    """Per-hop pattern checks and name conversion, path by path vs on a whole padded batch"""
+    generator = _pnr_generator(n_i, n_o, n_dn, n_trios)
+    index_paths = [path for path, _ in generator._iter_index_paths(max_length)]
+    batch = np.full((len(index_paths), max_length), -1, dtype=np.int32)
+    for row, path in zip(batch, index_paths):
+        row[:len(path)] = path
+    print(f"Type checks on {len(index_paths)} CPUXs of up to {max_length} components")
+    start = time.perf_counter()
+    per_path = [all(generator._follows_pattern(a, b) for a, b in zip(path, path[1:])) for path in index_paths]
+    print(f"  per-hop checks:    {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    batched = generator.pattern_mask(batch)
+    print(f"  pattern_mask:      {time.perf_counter() - start:.3f}s, same: {batched.tolist() == per_path}")
+    assert batched.tolist() == per_path
+    start = time.perf_counter()
+    names = [generator._convert_path_to_components(path) for path in index_paths]
+    print(f"  per-path names:    {time.perf_counter() - start:.3f}s")
+    start = time.perf_counter()
+    decoded = generator.decode_paths(batch)
+    print(f"  decode_paths:      {time.perf_counter() - start:.3f}s, same: {decoded == names}")
+    assert decoded == names
+
+
+def _flow_registry(n_stages: int):
+    """Objects and design nodes for a chain of n_stages object -> design node hops over PnR dicts"""
+    objects = {}
+    design_nodes = {}
+    for k in range(n_stages):
+        objects[f"object{k}"] = {"receives": f"request{k}", "reflects": f"reflected{k}",
+                                 "pnr_mapping": {"value": "value"}, "pnr_defaults": {"value": [0]}}
+        design_nodes[f"node{k}"] = {"receives": f"reflected{k}", "emits": f"request{k + 1}",
+                                    "process_pnr": lambda pnr: {"value": [pnr["value"][0] + 1]}}
+    return objects, design_nodes
+
+
+def bench_flows(n_flows=20_000, n_stages=5):
+    """Headless intention flow engine throughput, with and without a subscriber"""
+    objects, design_nodes = _flow_registry(n_stages)
+    print(f"Intention flows through {n_stages} object/design node stages")
+    for label, subscribed in (("no subscriber", False), ("one subscriber", True)):
+        engine = IntentionFlowEngine(objects, design_nodes)
+        if subscribed:
+            engine.subscribe(lambda event: None)
+        start = time.perf_counter()
+        for _ in range(n_flows):
+            engine.start_flow("request0", {"value": [0]})
+        engine.run()
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<15} {engine.flows_done} flows in {elapsed:.3f}s, "
+              f"{engine.flows_done / elapsed:,.0f} flows/s")
+
+
+def bench_async_flows(n_flows=10_000, n_stages=5, max_concurrent=1_000, max_queued=2_000):
+    """
+    10k simultaneous flows through the asyncio runtime with inline, coroutine and
+    thread-offloaded design nodes; checks every flow ends with the right PnR and
+    that concurrency stays within max_concurrent
+    """
+    objects, design_nodes = _flow_registry(n_stages)
+    
+    async def sleepy(pnr):
+        await asyncio.sleep(0.001)
+        return {"value": [pnr["value"][0] + 1]}
+    coroutine_nodes = {name: dict(node, process_pnr=sleepy) for name, node in design_nodes.items()}
+    
+    async def run(nodes, offload):
+        runtime = AsyncIntentionRuntime(objects, nodes, max_concurrent=max_concurrent,
+                                        max_queued=max_queued, offload=offload)
+        async with runtime:
+            flows = [await runtime.submit("request0", {"value": [0]}) for _ in range(n_flows)]
+        ok = all(flow.outputs == [(f"request{n_stages}", {"value": [n_stages]})] for flow in flows)
+        return runtime, ok
+    
+    print(f"{n_flows} concurrent flows through {n_stages} stages, "
+          f"max_concurrent={max_concurrent}, max_queued={max_queued}")
+    for label, nodes, offload in (("inline", design_nodes, False),
+                                  ("coroutines", coroutine_nodes, False),
+                                  ("thread pool", design_nodes, True)):
+        start = time.perf_counter()
+        runtime, ok = asyncio.run(run(nodes, offload))
+        elapsed = time.perf_counter() - start
+        print(f"  {label:<12} {runtime.flows_done} flows in {elapsed:.3f}s, "
+              f"{runtime.flows_done / elapsed:,.0f} flows/s, peak {runtime.peak_active} active, "
+              f"all correct: {ok and runtime.peak_active <= max_concurrent}")
+        assert ok and runtime.peak_active <= max_concurrent
+
+
+def bench_plans(n_runs=20_000, n_stages=5):
+    """Compiled CPUX execution plans vs dynamic dispatch through the intention flow engine"""
+    objects, design_nodes = _flow_registry(n_stages)
+    generator = generator_from_registries(objects, design_nodes)
+    max_length = 4 * n_stages + 1
+    start = time.perf_counter()
+    feasible = [(cpux, final_pnr) for cpux, final_pnr in generator.get_feasible_cpuxs(max_length)
+                if cpux[0] == "request0" and len(cpux) == max_length]
+    plan, = compile_cpuxs(feasible, objects, design_nodes)
+    print(f"Full {n_stages}-stage chain ({len(plan.cpux)} components) generated and compiled in "
+          f"{time.perf_counter() - start:.3f}s")
+    
+    engine = IntentionFlowEngine(objects, design_nodes)
+    start = time.perf_counter()
+    flows = [engine.start_flow("request0", {"value": [0]}) for _ in range(n_runs)]
+    engine.run()
+    dynamic = time.perf_counter() - start
+    start = time.perf_counter()
+    results = [plan.run({"value": [0]}) for _ in range(n_runs)]
+    compiled = time.perf_counter() - start
+    same = all(flow.outputs[0][1] == result for flow, result in zip(flows, results))
+    print(f"  dynamic dispatch: {n_runs} runs in {dynamic:.3f}s")
+    print(f"  compiled plan:    {n_runs} runs in {compiled:.3f}s ({dynamic / compiled:.1f}x), same PnR: {same}")
+    assert same
+
+
+def bench_batched_nodes(n_flows=10_000, n_stages=5, batch_sizes=(1, 64, 512), batch_latency=0.002):
+    """
+    Per-record design nodes vs columnar process_pnr_batch micro-batches in the
+    asyncio runtime, inline and offloaded to the thread pool where batching saves
+    one hand-off per record
+    """
+    objects, design_nodes = _flow_registry(n_stages)
+    for node in design_nodes.values():
+        node["process_pnr_batch"] = lambda columns: {"value": columns["value"] + 1}
+    
+    records = [{"value": [k]} for k in range(n_flows)]
+    node = design_nodes["node0"]
+    start = time.perf_counter()
+    single = [node["process_pnr"](pnr) for pnr in records]
+    per_record = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = columns_to_pnrs(node["process_pnr_batch"](pnrs_to_columns(records)), n_flows)
+    print(f"One design node over {n_flows} PnRs: per record {per_record:.4f}s, "
+          f"one columnar batch {time.perf_counter() - start:.4f}s, same: {batched == single}")
+    assert batched == single
+    
+    max_concurrent = 1_000
+    async def run(batch_size, offload):
+        runtime = AsyncIntentionRuntime(objects, design_nodes, max_concurrent=max_concurrent, offload=offload,
+                                        batch_size=batch_size, batch_latency=batch_latency)
+        async with runtime:
+            flows = [await runtime.submit("request0", {"value": [0]}) for _ in range(n_flows)]
+        ok = all(flow.outputs == [(f"request{n_stages}", {"value": [n_stages]})] for flow in flows)
+        return runtime, ok
+    
+    print(f"{n_flows} flows through {n_stages} stages, batch latency cap {batch_latency * 1000:.0f}ms")
+    for offload in (False, True):
+        for batch_size in batch_sizes:
+            start = time.perf_counter()
+            runtime, ok = asyncio.run(run(batch_size, offload))
+            elapsed = time.perf_counter() - start
+            print(f"  {'thread pool' if offload else 'inline':<11} batch_size={batch_size:<5} {elapsed:.3f}s, "
+                  f"{runtime.flows_done / elapsed:,.0f} flows/s, {runtime.batches_run} batches, all correct: {ok}")
+            assert ok and runtime.peak_active <= max_concurrent
+
+
+BENCHMARKS = {
+    "trios": bench_trios,
+    "expansion": bench_expansion,
+    "dedupe": bench_dedupe,
+    "pruning": bench_pruning,
+    "synctest": bench_synctest,
+    "batch": bench_batch,
+    "reachability": bench_reachability,
+    "reachability_table": bench_reachability_table,
+    "reach_index": bench_reach_index,
+    "count": bench_count,
+    "revisits": bench_revisits,
+    "parallel": bench_parallel,
+    "stealing": bench_stealing,
+    "dfs": bench_dfs,
+    "store": bench_store,
+    "types": bench_types,
+    "flows": bench_flows,
+    "async_flows": bench_async_flows,
+    "plans": bench_plans,
+    "batched_nodes": bench_batched_nodes,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CPUX generator benchmarks")
+    parser.add_argument("names", nargs="*",
+                        help=f"benchmarks to run, any of {', '.join(BENCHMARKS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
+        print()
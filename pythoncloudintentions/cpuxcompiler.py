@@ -0,0 +1,111 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from genwithpnr import CPUXGeneratorWithPnR, PnRSet
+from intentionflow import _as_list
+
+# Operation codes of ExecutionPlan.ops
+OP_OBJECT, OP_DESIGN_NODE = 0, 1
+
+
+def generator_from_registries(objects: Dict[str, dict], design_nodes: Dict[str, dict],
+                              intentions: Optional[Dict[str, dict]] = None,
+                              sparse: bool = False) -> CPUXGeneratorWithPnR:
+    """
+    CPUX generator over the demo registries: every intention string is an
+    intention, an object receiving i1 and reflecting i2 is an i-o-i trio and a
+    design node receiving i1 and emitting i2 is an i-dn-i trio. Registry entries
+    with gatekeeper/flowin/flowout PnR dicts get them as component PnRs.
+    """
+    names: Dict[str, int] = {}
+    for intention in (intentions or {}).values():
+        names.setdefault(intention["string"], len(names))
+    for registry, outgoing in ((objects, "reflects"), (design_nodes, "emits")):
+        for entry in registry.values():
+            for intention in _as_list(entry.get("receives")) + _as_list(entry.get(outgoing)):
+                names.setdefault(intention, len(names))
+
+    generator = CPUXGeneratorWithPnR(list(names), list(objects), list(design_nodes), sparse)
+    trios = []
+    for o_idx, obj in enumerate(objects.values()):
+        trios.extend(("ioi", names[i1], o_idx, names[i2])
+                     for i1 in _as_list(obj.get("receives")) for i2 in _as_list(obj.get("reflects")))
+    for dn_idx, node in enumerate(design_nodes.values()):
+        trios.extend(("idni", names[i1], dn_idx, names[i2])
+                     for i1 in _as_list(node.get("receives")) for i2 in _as_list(node.get("emits")))
+    generator.add_trios(trios)
+
+    for registry in (objects, design_nodes):
+        for name, entry in registry.items():
+            if any(key in entry for key in ("gatekeeper", "flowin", "flowout")):
+                generator.add_component_pnr(name, entry.get("gatekeeper"), entry.get("flowin"),
+                                            entry.get("flowout"))
+    return generator
+
+
+class ExecutionPlan:
+    def __init__(self, cpux: List[str], ops: List[tuple], final_pnr: Optional[PnRSet] = None):
+        """
+        A CPUX compiled to a flat list of operations, one per object or design node:
+        (OP_OBJECT, name, ((in_key, out_key), ...), defaults) or (OP_DESIGN_NODE,
+        name, handler). Objects without a pnr_mapping pass payloads through and are
+        left out of ops.
+        """
+        self.cpux = cpux
+        self.ops = ops
+        self.final_pnr = final_pnr
+
+    def run(self, payload: object) -> object:
+        """Walk the plan: the payload IntentionFlowEngine would carry along the same route"""
+        for op in self.ops:
+            if op[0] == OP_DESIGN_NODE:
+                payload = op[2](payload)
+            elif isinstance(payload, dict):
+                defaults = op[3]
+                mapped = {}
+                for in_key, out_key in op[2]:
+                    if in_key in payload:
+                        mapped[out_key] = payload[in_key]
+                    elif out_key in defaults:
+                        mapped[out_key] = defaults[out_key]
+                payload = mapped
+        return payload
+
+
+def compile_cpux(cpux: List[str], objects: Dict[str, dict], design_nodes: Dict[str, dict],
+                 final_pnr: Optional[PnRSet] = None) -> ExecutionPlan:
+    """Resolve every component of a CPUX to its handler or PnR mapping once"""
+    ops = []
+    for name in cpux:
+        if name in design_nodes:
+            node = design_nodes[name]
+            handler = node.get("process_pnr") or node.get("function")
+            if handler is not None:
+                ops.append((OP_DESIGN_NODE, name, handler))
+        elif name in objects:
+            obj = objects[name]
+            mapping = obj.get("pnr_mapping")
+            if mapping is not None:
+                ops.append((OP_OBJECT, name, tuple(mapping.items()), dict(obj.get("pnr_defaults", {}))))
+    return ExecutionPlan(list(cpux), ops, final_pnr)
+
+
+def compile_cpuxs(cpuxs: Iterable[Union[List[str], Tuple[List[str], PnRSet]]], objects: Dict[str, dict],
+                  design_nodes: Dict[str, dict]) -> List[ExecutionPlan]:
+    """Compile CPUXs, or the (cpux, final PnR) pairs of get_feasible_cpuxs, into execution plans"""
+    plans = []
+    for item in cpuxs:
+        cpux, final_pnr = item if isinstance(item, tuple) else (item, None)
+        plans.append(compile_cpux(cpux, objects, design_nodes, final_pnr))
+    return plans
+
+
+# Example usage
+if __name__ == "__main__":
+    import demo2withpnr
+
+    generator = generator_from_registries(demo2withpnr.objects, demo2withpnr.design_nodes)
+    feasible = generator.get_feasible_cpuxs(max_length=5)
+    plans = compile_cpuxs(feasible, demo2withpnr.objects, demo2withpnr.design_nodes)
+    for plan in plans:
+        if plan.cpux[0] == "change_cloud_color":
+            print(" -> ".join(plan.cpux), plan.run({"mycolor": ["blue"]}))
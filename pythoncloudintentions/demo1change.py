@@ -2,6 +2,8 @@ import tkinter as tk
 from tkinter import Canvas
 import time
 
+from intentionflow import IntentionFlowEngine
+
 # Dictionary of Objects with their receiving and reflecting intentions
 objects = {
     "cloud": {
@@ -54,51 +56,48 @@ class IntentionFlowDemo:
         self.current_color = "gray"
         self.current_mood = "neutral"
         
+        # The flow runs in a headless engine; this window only shows its events
+        self.engine = IntentionFlowEngine(objects, design_nodes)
+        self.engine.subscribe(self.on_event)
+        
         # Start the interaction loop
         self.root.after(1000, self.simulate_intention_flow)
+        self.root.after(1000, self.advance_flow)
 
     def update_labels(self, intention, object_name):
         self.intention_label.config(text=f"Current Intention: {intention}")
         self.object_label.config(text=f"Current Object: {object_name}")
 
+    def on_event(self, event):
+        if event.kind != "object":
+            return
+        self.update_labels(event.intention, event.name)
+        
+        # Simulate object reflecting intention
+        if event.name == "cloud":
+            self.canvas.itemconfig(self.cloud, fill=event.payload)
+            self.current_color = event.payload
+
+    def advance_flow(self):
+        # One hop of every active flow per second
+        self.engine.advance()
+        self.root.after(1000, self.advance_flow)
+
     def simulate_intention_flow(self):
         # Simulate human initiating intention
-        self.emit_intention("change_cloud_color", "blue")
+        self.engine.start_flow("change_cloud_color", "blue")
         self.root.after(2000, self.continue_flow)
 
-    def emit_intention(self, intention, value):
-        # Find object that receives this intention
-        for obj_name, obj in objects.items():
-            if obj["receives"] == intention:
-                self.update_labels(intention, obj_name)
-                
-                # Simulate object reflecting intention
-                if obj_name == "cloud":
-                    self.canvas.itemconfig(self.cloud, fill=value)
-                    self.current_color = value
-                    
-                # Find design node that receives reflected intention
-                reflected_intention = obj["reflects"]
-                self.process_design_node(reflected_intention, value)
-
-    def process_design_node(self, intention, value):
-        # Find design node that handles this intention
-        for node_name, node in design_nodes.items():
-            if node["receives"] == intention:
-                # Process the value through the design node
-                result = node["function"](value)
-                # Emit new intention
-                self.root.after(1000, lambda: self.emit_intention(node["emits"], result))
-
     def continue_flow(self):
         # Toggle cloud color
         new_color = "gray" if self.current_color == "blue" else "blue"
-        self.emit_intention("change_cloud_color", new_color)
+        self.engine.start_flow("change_cloud_color", new_color)
         self.root.after(2000, self.continue_flow)
 
     def run(self):
         self.root.mainloop()
 
 # Create and run the demo
-demo = IntentionFlowDemo()
-demo.run()
\ No newline at end of file
+if __name__ == "__main__":
+    demo = IntentionFlowDemo()
+    demo.run()
@@ -2,6 +2,10 @@ import tkinter as tk
 from tkinter import Canvas
 import time
 
+import numpy as np
+
+from intentionflow import IntentionFlowEngine
+
 # PnR sets for each design node
 pnr_sets = {
     "color_processor": {
@@ -30,6 +34,9 @@ objects = {
         "image": "☁️",
         "pnr_mapping": {
             "mycolor": "mycolor"  # Keep the same key for cloud color
+        },
+        "pnr_defaults": {
+            "mycolor": ["gray"]  # Used when the incoming PnR lacks the key
         }
     },
     "mood": {
@@ -38,6 +45,9 @@ objects = {
         "image": "😊",
         "pnr_mapping": {
             "mymood": "mymood"  # Keep the same key for mood
+        },
+        "pnr_defaults": {
+            "mymood": ["neutral"]
         }
     }
 }
@@ -50,6 +60,10 @@ design_nodes = {
         "function": lambda color: "happy" if color == "blue" else "neutral",
         "process_pnr": lambda pnr: {
             "mymood": ["happy"] if pnr.get("mycolor", ["gray"])[0] == "blue" else ["neutral"]
+        },
+        # The same over columns of many PnRs, for batching runtimes
+        "process_pnr_batch": lambda columns: {
+            "mymood": np.where(columns.get("mycolor") == "blue", "happy", "neutral")
         }
     },
     "mood_processor": {
@@ -58,6 +72,9 @@ design_nodes = {
         "function": lambda mood: "blue" if mood == "happy" else "gray",
         "process_pnr": lambda pnr: {
             "mycolor": ["blue"] if pnr.get("mymood", ["neutral"])[0] == "happy" else ["gray"]
+        },
+        "process_pnr_batch": lambda columns: {
+            "mycolor": np.where(columns.get("mymood") == "happy", "blue", "gray")
         }
     }
 }
@@ -88,59 +105,47 @@ class IntentionFlowDemo:
         # Initialize state
         self.current_pnr = {"mycolor": ["gray"]}
         
+        # The flow runs in a headless engine; this window only shows its events
+        self.engine = IntentionFlowEngine(objects, design_nodes)
+        self.engine.subscribe(self.on_event)
+        
         # Start the interaction loop
         self.root.after(1000, self.simulate_intention_flow)
+        self.root.after(1000, self.advance_flow)
 
     def update_labels(self, intention, object_name, pnr):
         self.intention_label.config(text=f"Current Intention: {intention}")
         self.object_label.config(text=f"Current Object: {object_name}")
         self.pnr_label.config(text=f"Current PnR: {pnr}")
 
+    def on_event(self, event):
+        if event.kind != "object":
+            return
+        mapped_pnr = event.payload
+        self.update_labels(event.intention, event.name, mapped_pnr)
+        
+        # Update visual state if it's the cloud object
+        if event.name == "cloud" and "mycolor" in mapped_pnr:
+            color = mapped_pnr["mycolor"][0]
+            self.canvas.itemconfig(self.cloud, fill=color)
+            self.current_pnr = mapped_pnr
+
+    def advance_flow(self):
+        # One hop of every active flow per second
+        self.engine.advance()
+        self.root.after(1000, self.advance_flow)
+
     def simulate_intention_flow(self):
         # Simulate human initiating intention with PnR
         initial_pnr = {"mycolor": ["blue"]}
-        self.emit_intention("change_cloud_color", initial_pnr)
+        self.engine.start_flow("change_cloud_color", initial_pnr)
         self.root.after(2000, self.continue_flow)
 
-    def emit_intention(self, intention, pnr):
-        # Find object that receives this intention
-        for obj_name, obj in objects.items():
-            if obj["receives"] == intention:
-                # Map PnR through object
-                mapped_pnr = {}
-                for in_key, out_key in obj["pnr_mapping"].items():
-                    if in_key in pnr:
-                        mapped_pnr[out_key] = pnr[in_key]
-                    else:
-                        # Provide default values if key not found
-                        mapped_pnr[out_key] = ["gray"] if out_key == "mycolor" else ["neutral"]
-                
-                self.update_labels(intention, obj_name, mapped_pnr)
-                
-                # Update visual state if it's the cloud object
-                if obj_name == "cloud" and "mycolor" in mapped_pnr:
-                    color = mapped_pnr["mycolor"][0]
-                    self.canvas.itemconfig(self.cloud, fill=color)
-                    self.current_pnr = mapped_pnr
-                
-                # Find design node that receives reflected intention
-                reflected_intention = obj["reflects"]
-                self.process_design_node(reflected_intention, mapped_pnr)
-
-    def process_design_node(self, intention, pnr):
-        # Find design node that handles this intention
-        for node_name, node in design_nodes.items():
-            if node["receives"] == intention:
-                # Process the PnR through the design node
-                processed_pnr = node["process_pnr"](pnr)
-                # Emit new intention with processed PnR
-                self.root.after(1000, lambda: self.emit_intention(node["emits"], processed_pnr))
-
     def continue_flow(self):
         # Toggle cloud color through PnR
         new_color = "gray" if self.current_pnr["mycolor"][0] == "blue" else "blue"
         new_pnr = {"mycolor": [new_color]}
-        self.emit_intention("change_cloud_color", new_pnr)
+        self.engine.start_flow("change_cloud_color", new_pnr)
         self.root.after(2000, self.continue_flow)
 
     def run(self):
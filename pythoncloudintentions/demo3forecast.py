@@ -3,6 +3,10 @@ from tkinter import Canvas, Button
 import random
 import time
 
+import numpy as np
+
+from intentionflow import IntentionFlowEngine
+
 # Dictionary of all intention strings with their types and sequence numbers
 intentions = {
     "act_now": {
@@ -85,6 +89,10 @@ design_nodes = {
         "emits": intentions["set_storm_state"]["string"],
         "process_pnr": lambda pnr: {
             "weather_state": ["severe_storm" if pnr.get("storm_level", ["low"])[0] == "high" else "mild_storm"]
+        },
+        # The same over columns of many PnRs, for batching runtimes
+        "process_pnr_batch": lambda columns: {
+            "weather_state": np.where(columns.get("storm_level") == "high", "severe_storm", "mild_storm")
         }
     },
     "flood_processor": {
@@ -92,10 +100,19 @@ design_nodes = {
         "emits": intentions["set_flood_state"]["string"],
         "process_pnr": lambda pnr: {
             "weather_state": ["severe_flood" if pnr.get("flood_level", ["low"])[0] == "high" else "mild_flood"]
+        },
+        "process_pnr_batch": lambda columns: {
+            "weather_state": np.where(columns.get("flood_level") == "high", "severe_flood", "mild_flood")
         }
     }
 }
 
+def follow_cpux_type(flow, node_name, emitted):
+    """The forecaster emits both warnings; a flow only follows the one of its CPUX type"""
+    if node_name != "weather_forecaster":
+        return emitted
+    return ["potential_storm" if flow.context["cpux_type"] == "Storm" else "potential_flood"]
+
 class WeatherIntentionFlowDemo:
     def __init__(self):
         self.root = tk.Tk()
@@ -130,6 +147,10 @@ class WeatherIntentionFlowDemo:
 
         # Initialize state
         self.current_state = "normal"
+        
+        # The flow runs in a headless engine; this window only shows its events
+        self.engine = IntentionFlowEngine(objects, design_nodes, intentions, branch=follow_cpux_type)
+        self.engine.subscribe(self.on_event)
 
     def start_intention_flow(self):
         """Initiates the intention flow when button is clicked"""
@@ -137,51 +158,28 @@ class WeatherIntentionFlowDemo:
         cpux_type = random.choice(["Storm", "Flood"])
         self.update_labels("act_now", cpux_type)
         initial_pnr = {"action": ["check_weather"]}
-        self.emit_intention("act_now", initial_pnr, cpux_type)
+        self.engine.start_flow("act_now", initial_pnr, {"cpux_type": cpux_type})
+        self.root.after(1000, self.advance_flow)
+
+    def advance_flow(self):
+        """Runs one hop per second until the flow is done"""
+        if self.engine.advance():
+            self.root.after(1000, self.advance_flow)
 
-    def emit_intention(self, intention_key, pnr, cpux_type):
-        """Emits an intention to the appropriate object"""
-        intention_str = intentions[intention_key]["string"]
+    def on_event(self, event):
+        """Shows what the engine did"""
+        if event.kind not in ("object", "design_node"):
+            return
+        intention_key = self.engine.router.intention_key(event.intention)
+        cpux_type = event.flow.context["cpux_type"]
         self.update_labels(intention_key, cpux_type)
         
-        # Handle weather forecaster node specially
-        if intention_str == intentions["check_weather"]["string"]:
-            next_intention = "potential_storm" if cpux_type == "Storm" else "potential_flood"
-            processed_pnr = design_nodes["weather_forecaster"]["process_pnr"](pnr)
-            self.root.after(1000, lambda: self.emit_intention(next_intention, processed_pnr, cpux_type))
-            return
-
-        # Process through appropriate processor
-        if intention_str in [intentions["analyze_storm"]["string"], 
-                           intentions["analyze_flood"]["string"]]:
-            processor = "storm_processor" if cpux_type == "Storm" else "flood_processor"
-            processed_pnr = design_nodes[processor]["process_pnr"](pnr)
-            weather_state = processed_pnr["weather_state"][0]
+        # The storm and flood processors end the flow with the weather state
+        if event.kind == "design_node" and "weather_state" in event.payload:
+            weather_state = event.payload["weather_state"][0]
             self.draw_weather_state(weather_state)
             self.update_labels(intention_key, cpux_type, weather_state)
             self.root.after(2000, lambda: self.action_button.config(state='normal'))
-            return
-
-        # Process through objects
-        for obj_name, obj in objects.items():
-            if obj["receives"] == intention_str:
-                self.process_object(obj, intention_key, pnr, cpux_type)
-                break
-
-    def process_object(self, obj, intention_key, pnr, cpux_type):
-        """Processes an intention through an object"""
-        # Map PnR through object
-        mapped_pnr = {}
-        for in_key, out_key in obj["pnr_mapping"].items():
-            if in_key in pnr:
-                mapped_pnr[out_key] = pnr[in_key]
-
-        # Get next intention and emit
-        reflected_intention = obj["reflects"]
-        next_intention = next(k for k, v in intentions.items() 
-                            if v["string"] == reflected_intention)
-        self.root.after(1000, lambda: self.emit_intention(
-            next_intention, mapped_pnr, cpux_type))
 
     def draw_weather_state(self, state):
         """Updates the visual representation of the weather state"""
@@ -1,45 +1,191 @@
 import numpy as np
-from typing import List, Set, Tuple, Dict, Optional
+from array import array
+from bisect import bisect_left
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Sequence, Set, Tuple, Dict, Optional, Union
+
+# Node type codes of CPUXGenerator.node_types
+NODE_DN, NODE_I, NODE_O = 0, 1, 2
+NODE_TYPE_NAMES = ("DN", "I", "O")
+
+# PATTERN_ALLOWED[curr_type, next_type]: DN->I, I->DN or I->O, O->I
+PATTERN_ALLOWED = np.array([[False, True, False],
+                            [True, False, True],
+                            [False, True, False]])
 
 class CPUXGenerator:
-    def __init__(self, intentions: List[str], objects: List[str], design_nodes: List[str]):
+    def __init__(self, intentions: List[str], objects: List[str], design_nodes: List[str],
+                 sparse: bool = False):
         self.intentions = intentions
         self.objects = objects
         self.design_nodes = design_nodes
-        
-        # Initialize basic adjacency matrices
-        self.dn_i_matrix = np.zeros((len(design_nodes), len(intentions)))  # DN -> I emissions
-        self.i_dn_matrix = np.zeros((len(intentions), len(design_nodes)))  # I -> DN absorptions
-        self.i_o_matrix = np.zeros((len(intentions), len(objects)))       # I -> O received
-        self.o_i_matrix = np.zeros((len(objects), len(intentions)))       # O -> I reflections
+        self.sparse = sparse
         
         # Store valid i-o-i trios and i-dn-i trios
         self.valid_ioi: Set[Tuple[int, int, int]] = set()
         self.valid_idni: Set[Tuple[int, int, int]] = set()
         
-        # Initialize combined transition matrix
         self.n_dn = len(design_nodes)
         self.n_i = len(intentions)
         self.n_o = len(objects)
         self.n_total = self.n_dn + self.n_i + self.n_o
+        
+        # Type code and name of every node index; a name shared by several nodes maps to the first
+        self.node_types = np.repeat(np.array([NODE_DN, NODE_I, NODE_O], dtype=np.int8),
+                                    [self.n_dn, self.n_i, self.n_o])
+        self.node_names: List[str] = list(design_nodes) + list(intentions) + list(objects)
+        self._name_array = np.empty(self.n_total, dtype=object)
+        self._name_array[:] = self.node_names
+        self.node_index: Dict[str, int] = {}
+        for idx, name in enumerate(self.node_names):
+            self.node_index.setdefault(name, idx)
+        self._type_codes: List[int] = self.node_types.tolist()
+        self._pattern_allowed: List[List[bool]] = PATTERN_ALLOWED.tolist()
+        self._successor_index: Optional[List[List[int]]] = None
+        self._reach_index: Optional['ReachabilityIndex'] = None
+        self._parallel_stats: Dict[int, Dict[str, float]] = {}
+        
+        if sparse:
+            # Sorted successor list per node, memory grows with the edge count only
+            self.successors: List[List[int]] = [[] for _ in range(self.n_total)]
+            self.dn_i_matrix = None
+            self.i_dn_matrix = None
+            self.i_o_matrix = None
+            self.o_i_matrix = None
+            self.transition_matrix = None
+            return
+        
+        # Initialize basic adjacency matrices
+        self.dn_i_matrix = np.zeros((len(design_nodes), len(intentions)))  # DN -> I emissions
+        self.i_dn_matrix = np.zeros((len(intentions), len(design_nodes)))  # I -> DN absorptions
+        self.i_o_matrix = np.zeros((len(intentions), len(objects)))       # I -> O received
+        self.o_i_matrix = np.zeros((len(objects), len(intentions)))       # O -> I reflections
+        
+        # Initialize combined transition matrix
         self.transition_matrix = np.zeros((self.n_total, self.n_total))
         
     def add_ioi_trio(self, i1_idx: int, o_idx: int, i2_idx: int):
         """Add valid i-o-i trio"""
         self.valid_ioi.add((i1_idx, o_idx, i2_idx))
-        self.i_o_matrix[i1_idx, o_idx] = 1
-        self.o_i_matrix[o_idx, i2_idx] = 1
-        self._update_transition_matrix()
+        if not self.sparse:
+            self.i_o_matrix[i1_idx, o_idx] = 1
+            self.o_i_matrix[o_idx, i2_idx] = 1
+        self._add_edge(self.n_dn + i1_idx, self.n_dn + self.n_i + o_idx)
+        self._add_edge(self.n_dn + self.n_i + o_idx, self.n_dn + i2_idx)
         
     def add_idni_trio(self, i1_idx: int, dn_idx: int, i2_idx: int):
         """Add valid i-dn-i trio"""
         self.valid_idni.add((i1_idx, dn_idx, i2_idx))
-        self.i_dn_matrix[i1_idx, dn_idx] = 1
-        self.dn_i_matrix[dn_idx, i2_idx] = 1
-        self._update_transition_matrix()
+        if not self.sparse:
+            self.i_dn_matrix[i1_idx, dn_idx] = 1
+            self.dn_i_matrix[dn_idx, i2_idx] = 1
+        self._add_edge(self.n_dn + i1_idx, dn_idx)
+        self._add_edge(dn_idx, self.n_dn + i2_idx)
+        
+    def add_trios(self, trios: Iterable[Tuple[str, int, int, int]]):
+        """
+        Add many trios at once, each given as ("ioi", i1, o, i2) or ("idni", i1, dn, i2).
+        Every trio is validated before any of them is inserted.
+        """
+        ioi, idni = [], []
+        for trio in trios:
+            kind, i1_idx, mid_idx, i2_idx = trio
+            if kind == "ioi":
+                bucket, n_mid = ioi, self.n_o
+            elif kind == "idni":
+                bucket, n_mid = idni, self.n_dn
+            else:
+                raise ValueError(f"Unknown trio kind {kind!r}, expected 'ioi' or 'idni'")
+            for idx, limit in ((i1_idx, self.n_i), (mid_idx, n_mid), (i2_idx, self.n_i)):
+                if not isinstance(idx, (int, np.integer)) or not 0 <= idx < limit:
+                    raise ValueError(f"Index out of range in {kind} trio {tuple(trio[1:])}")
+            bucket.append((int(i1_idx), int(mid_idx), int(i2_idx)))
+            
+        self.valid_ioi.update(ioi)
+        self.valid_idni.update(idni)
+        
+        ioi_arr = np.array(ioi, dtype=np.int64).reshape(-1, 3)
+        idni_arr = np.array(idni, dtype=np.int64).reshape(-1, 3)
+        i1_ioi, o, i2_ioi = ioi_arr.T + np.array([[self.n_dn], [self.n_dn + self.n_i], [self.n_dn]])
+        i1_idni, dn, i2_idni = idni_arr.T + np.array([[self.n_dn], [0], [self.n_dn]])
+        srcs = np.concatenate([i1_ioi, o, i1_idni, dn])
+        dsts = np.concatenate([o, i2_ioi, dn, i2_idni])
+        
+        # One rebuild on the next query beats per-edge updates for bulk loads
+        self._reach_index = None
+        
+        if self.sparse:
+            touched = set()
+            for src, dst in zip(srcs.tolist(), dsts.tolist()):
+                self.successors[src].append(dst)
+                touched.add(src)
+            for src in touched:
+                self.successors[src] = sorted(set(self.successors[src]))
+            return
+        
+        self.i_o_matrix[ioi_arr[:, 0], ioi_arr[:, 1]] = 1
+        self.o_i_matrix[ioi_arr[:, 1], ioi_arr[:, 2]] = 1
+        self.i_dn_matrix[idni_arr[:, 0], idni_arr[:, 1]] = 1
+        self.dn_i_matrix[idni_arr[:, 1], idni_arr[:, 2]] = 1
+        self.transition_matrix[srcs, dsts] = 1
+        self._successor_index = None
+        
+    def _add_edge(self, src: int, dst: int):
+        """Set the src -> dst transition, touching only that cell or successor list"""
+        if not self.sparse:
+            self.transition_matrix[src, dst] = 1
+            succ = self._successor_index[src] if self._successor_index is not None else None
+        else:
+            succ = self.successors[src]
+        if succ is not None:
+            pos = bisect_left(succ, dst)
+            if pos == len(succ) or succ[pos] != dst:
+                succ.insert(pos, dst)
+        if self._reach_index is not None:
+            self._reach_index.add_edge(src, dst)
+            
+    def has_transition(self, src: int, dst: int) -> bool:
+        """Check if the combined graph has a src -> dst transition"""
+        if self.sparse:
+            succ = self.successors[src]
+            pos = bisect_left(succ, dst)
+            return pos < len(succ) and succ[pos] == dst
+        return self.transition_matrix[src, dst] != 0
+    
+    def successor_index(self) -> List[List[int]]:
+        """Sorted successor list per node; built once from the dense matrix and kept in sync"""
+        if self.sparse:
+            return self.successors
+        if self._successor_index is None:
+            indptr, indices = self.to_csr()
+            flat = indices.tolist()
+            bounds = indptr.tolist()
+            self._successor_index = [flat[bounds[k]:bounds[k + 1]] for k in range(self.n_total)]
+        return self._successor_index
+    
+    def reachability_index(self) -> 'ReachabilityIndex':
+        """Reachability index over the current transitions, kept up to date as trios are added"""
+        if self._reach_index is None:
+            self._reach_index = ReachabilityIndex(self.successor_index())
+        return self._reach_index
+    
+    def to_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the transitions as CSR (indptr, indices) arrays"""
+        if self.sparse:
+            degrees = [len(succ) for succ in self.successors]
+            indices = [dst for succ in self.successors for dst in succ]
+        else:
+            rows, cols = np.nonzero(self.transition_matrix)
+            degrees = np.bincount(rows, minlength=self.n_total)
+            indices = cols
+        indptr = np.zeros(self.n_total + 1, dtype=np.int64)
+        np.cumsum(degrees, out=indptr[1:])
+        return indptr, np.asarray(indices, dtype=np.int32)
         
     def _update_transition_matrix(self):
-        """Update the combined transition matrix"""
+        """Rebuild the combined transition matrix from the four dense blocks"""
+        self._successor_index = None
+        self._reach_index = None
         self.transition_matrix.fill(0)
         
         # DN -> I transitions
@@ -56,12 +202,7 @@ class CPUXGenerator:
 
     def _get_component_type(self, idx: int) -> str:
         """Get the type of component (DN, I, or O) for a given index"""
-        if idx < self.n_dn:
-            return "DN"
-        elif idx < self.n_dn + self.n_i:
-            return "I"
-        else:
-            return "O"
+        return NODE_TYPE_NAMES[self._type_codes[idx]]
         
     def is_valid_sequence(self, path: List[int]) -> bool:
         """Check if sequence follows CPUX rules"""
@@ -70,59 +211,562 @@ class CPUXGenerator:
             
         # Check pattern rules
         for i in range(len(path) - 1):
-            curr_type = self._get_component_type(path[i])
-            next_type = self._get_component_type(path[i + 1])
-            
-            # Valid transitions: DN->I, I->DN or I->O, O->I
-            if curr_type == "DN" and next_type != "I":
-                return False
-            elif curr_type == "I" and next_type not in ["DN", "O"]:
-                return False
-            elif curr_type == "O" and next_type != "I":
+            if not self._follows_pattern(path[i], path[i + 1]):
                 return False
             
-            if self.transition_matrix[path[i], path[i + 1]] == 0:
+            if not self.has_transition(path[i], path[i + 1]):
                 return False
                 
         return True
     
-    def get_valid_paths(self, max_length: int = 10) -> List[List[str]]:
-        """Generate valid CPUXs using matrix operations"""
-        valid_paths = []
+    def _follows_pattern(self, curr_idx: int, next_idx: int) -> bool:
+        """Check a single hop against the CPUX pattern rules"""
+        return self._pattern_allowed[self._type_codes[curr_idx]][self._type_codes[next_idx]]
+    
+    def pattern_mask(self, paths: np.ndarray, pad: int = -1) -> np.ndarray:
+        """
+        Whether every hop of each row of a (num_paths, max_len) index array, padded
+        at the end with pad, follows the CPUX pattern rules; transitions are not checked
+        """
+        paths = np.asarray(paths)
+        if paths.shape[1] < 2:
+            return np.ones(len(paths), dtype=bool)
+        types = self.node_types[np.where(paths == pad, 0, paths)]
+        hop_ok = PATTERN_ALLOWED[types[:, :-1], types[:, 1:]] | (paths[:, 1:] == pad)
+        return hop_ok.all(axis=1)
+    
+    def get_valid_paths(self, max_length: int = 10, max_visits: Optional[int] = None,
+                        collapse_cycles: bool = False, workers: Optional[int] = None,
+                        split_depth: int = 1, steal: bool = False) -> List[List[str]]:
+        """
+        Generate valid CPUXs using matrix operations.
+        With workers set, subtrees below every split_depth-node prefix are explored
+        by a process pool (see parallelcpux); the result is identical. steal=True
+        lets idle workers take over unexplored prefixes of busy ones.
+        """
+        if workers is not None:
+            from parallelcpux import parallel_valid_paths
+            self._parallel_stats = {}
+            return parallel_valid_paths(self, max_length, workers, split_depth, max_visits,
+                                        collapse_cycles, steal, self._parallel_stats)
+        return list(self.iter_valid_paths(max_length, max_visits=max_visits, collapse_cycles=collapse_cycles))
+    
+    def parallel_stats(self) -> Dict[int, Dict[str, float]]:
+        """Per-worker tasks, paths explored and found, busy and idle seconds of the last parallel search, by pid"""
+        return self._parallel_stats
+    
+    def iter_valid_paths(self, max_length: int = 10, limit: Optional[int] = None,
+                         max_visits: Optional[int] = None, collapse_cycles: bool = False,
+                         order: str = "bfs") -> Iterator[List[str]]:
+        """
+        Yield valid CPUXs one at a time in BFS order, stopping after limit of them.
+        max_visits caps how often a path may pass through the same node (1 gives
+        simple paths only). collapse_cycles never extends a path past a repeated
+        node and emits each closed cycle once, as its canonical rotation: starting
+        and ending at its lowest-index intention or object, with no lead-in.
+        order="dfs" searches depth-first in O(max_length) memory, yielding each path
+        before its extensions; order="deepening" does the same once per length,
+        giving back the BFS order at the cost of re-walking shorter prefixes.
+        """
+        paths = self._index_paths(max_length, max_visits=max_visits, collapse_cycles=collapse_cycles, order=order)
+        for path, _ in islice(paths, limit):
+            yield self._convert_path_to_components(path)
+    
+    def _index_paths(self, max_length: int, step: Optional[Callable[[object, int], object]] = None,
+                     initial_state: object = None, max_visits: Optional[int] = None,
+                     collapse_cycles: bool = False, order: str = "bfs") -> Iterator[Tuple[List[int], object]]:
+        """Numeric paths with their states from the search engine for the given order"""
+        if order == "bfs":
+            return self._iter_index_paths(max_length, step, initial_state, max_visits, collapse_cycles)
+        if order == "dfs":
+            return self._iter_index_paths_dfs(max_length, step, initial_state, max_visits, collapse_cycles)
+        if order == "deepening":
+            return self._iter_index_paths_deepening(max_length, step, initial_state, max_visits, collapse_cycles)
+        raise ValueError(f"Unknown search order {order!r}, expected 'bfs', 'dfs' or 'deepening'")
+    
+    def _iter_index_paths_dfs(self, max_length: int, step: Optional[Callable[[object, int], object]] = None,
+                              initial_state: object = None, max_visits: Optional[int] = None,
+                              collapse_cycles: bool = False, exact: bool = False,
+                              deeper: Optional[List[bool]] = None) -> Iterator[Tuple[List[int], object]]:
+        """
+        Depth-first counterpart of _iter_index_paths. Only the current path is kept,
+        as a stack of one _expand_paths generator per depth acting as that depth's
+        successor cursor, so memory does not grow with the number of CPUXs. Paths
+        come out in preorder, or only those of exactly max_length nodes if exact;
+        then deeper gets True appended if any of them could be extended further.
+        """
+        if max_visits is not None and max_visits < 1:
+            raise ValueError(f"max_visits must be at least 1, got {max_visits}")
+        layers = 0
+        if max_visits is not None or collapse_cycles:
+            layers = max_visits or 1
+        min_length = max_length if exact else 3
+        successors = self.successor_index()
         
-        # Start with both objects and intentions
+        for start in range(self.n_dn, self.n_total):
+            entry = self._root_entry([start], step, initial_state, layers)
+            if entry is None or max_length < 2:
+                continue
+            stack = [self._expand_paths([entry], successors, step, max_visits, collapse_cycles)]
+            while stack:
+                child = next(stack[-1], None)
+                if child is None:
+                    stack.pop()
+                    continue
+                new_path, prefix_valid, state, visits, extendable = child
+                if prefix_valid and len(new_path) >= min_length:
+                    yield new_path, state
+                if not extendable:
+                    continue
+                if len(new_path) < max_length:
+                    stack.append(self._expand_paths([(new_path, prefix_valid, state, visits)], successors,
+                                                    step, max_visits, collapse_cycles))
+                elif deeper is not None and not deeper:
+                    deeper.append(True)
+    
+    def _iter_index_paths_deepening(self, max_length: int, step: Optional[Callable[[object, int], object]] = None,
+                                    initial_state: object = None, max_visits: Optional[int] = None,
+                                    collapse_cycles: bool = False) -> Iterator[Tuple[List[int], object]]:
+        """
+        Iterative deepening over _iter_index_paths_dfs: one exact-length pass per
+        length, each in index order, which is the order of the BFS engine
+        """
+        for length in range(3, max_length + 1):
+            deeper: List[bool] = []
+            yield from self._iter_index_paths_dfs(length, step, initial_state, max_visits,
+                                                  collapse_cycles, exact=True, deeper=deeper)
+            if not deeper:
+                break
+    
+    def _iter_index_paths(self, max_length: int, step: Optional[Callable[[object, int], object]] = None,
+                          initial_state: object = None, max_visits: Optional[int] = None,
+                          collapse_cycles: bool = False, roots: Optional[List[List[int]]] = None,
+                          frontier: Optional[List[List[int]]] = None,
+                          explored: Optional[List[int]] = None) -> Iterator[Tuple[List[int], object]]:
+        """
+        Yield valid numeric paths in BFS order as soon as they are found.
+        When step is given, every frontier path carries a state derived from its
+        parent's with step(state, next_idx); a None state prunes the whole subtree.
+        Search starts from every intention and object, or below the given roots
+        (equal-length prefixes, not yielded themselves); paths left on the frontier
+        at max_length are appended to frontier when a list is passed, and the
+        number of paths explored (every extension made) to explored.
+        """
+        if max_visits is not None and max_visits < 1:
+            raise ValueError(f"max_visits must be at least 1, got {max_visits}")
+        # Start with both objects and intentions; each frontier entry carries
+        # whether every hop of the path so far follows the CPUX rules, its state
+        # and, in the revisit-limiting modes, its visited-node bitsets
+        layers = 0
+        if max_visits is not None or collapse_cycles:
+            layers = max_visits or 1
+        if roots is None:
+            roots = [[start] for start in range(self.n_dn, self.n_total)]
+        else:
+            # Distinct roots and sorted, duplicate-free successor lists mean the
+            # search tree never reaches a path twice, so no emitted-path set is kept
+            roots = [list(root) for root in dict.fromkeys(tuple(root) for root in roots)]
         current_paths = []
-        current_paths.extend([[i + self.n_dn] for i in range(self.n_i)])
-        current_paths.extend([[i + self.n_dn + self.n_i] for i in range(self.n_o)])
+        for root in roots:
+            entry = self._root_entry(root, step, initial_state, layers)
+            if entry is not None:
+                current_paths.append(entry)
         
-        for _ in range(max_length - 1):
+        successors = self.successor_index()
+        depth = len(roots[0]) if roots else 1
+        extensions = 0
+        for _ in range(max_length - depth):
             new_paths = []
-            for path in current_paths:
-                last_idx = path[-1]
-                for next_idx in range(self.n_total):
-                    if self.transition_matrix[last_idx, next_idx] > 0:
-                        new_path = path + [next_idx]
-                        if self.is_valid_sequence(new_path):
-                            if new_path not in valid_paths:
-                                valid_paths.append(new_path)
-                        new_paths.append(new_path)
+            expanded = self._expand_paths(current_paths, successors, step, max_visits, collapse_cycles)
+            for new_path, prefix_valid, state, visits, extendable in expanded:
+                extensions += 1
+                if prefix_valid and len(new_path) >= 3:
+                    yield new_path, state
+                if extendable:
+                    new_paths.append((new_path, prefix_valid, state, visits))
             current_paths = new_paths
             if not current_paths:
                 break
-                
-        return [self._convert_path_to_components(path) for path in valid_paths]
+        if frontier is not None:
+            frontier.extend(entry[0] for entry in current_paths)
+        if explored is not None:
+            explored.append(extensions)
+    
+    def _root_entry(self, root: List[int], step: Optional[Callable[[object, int], object]],
+                    initial_state: object, layers: int
+                    ) -> Optional[Tuple[List[int], bool, object, Optional[Tuple[int, ...]]]]:
+        """Frontier entry for a search root, replaying its prefix; None if step prunes it"""
+        state = initial_state
+        prefix_valid = True
+        visits = (0,) * layers if layers else None
+        for pos, idx in enumerate(root):
+            if step is not None:
+                state = step(state, idx)
+                if state is None:
+                    return None
+            if pos:
+                prefix_valid = prefix_valid and self._follows_pattern(root[pos - 1], idx)
+            if visits is not None:
+                visits = self._add_visit(visits, 1 << idx)
+        return list(root), prefix_valid, state, visits
+    
+    def count_valid_paths(self, max_length: int = 10) -> Dict[str, Dict[int, int]]:
+        """
+        Count the CPUXs get_valid_paths would return, per start component and path
+        length (3..max_length), without enumerating them. walks[u] holds the number
+        of walks of k transitions leaving u that follow the CPUX rules; multiplying
+        it by the transition matrix gives k+1. The vector switches to Python ints
+        before int64 could overflow.
+        """
+        names = self.node_names
+        starts = range(self.n_dn, self.n_total)
+        counts = {names[start]: {length: 0 for length in range(3, max_length + 1)} for start in starts}
+        
+        # Transitions that can appear in a valid CPUX, grouped by source node
+        successors = self.successor_index()
+        edges = [(src, dst) for src in range(self.n_total) for dst in successors[src]
+                 if self._follows_pattern(src, dst)]
+        if not edges or max_length < 3:
+            return counts
+        src, dst = (np.array(column, dtype=np.int64) for column in zip(*edges))
+        sources, bounds = np.unique(src, return_index=True)
+        max_out_degree = int(np.diff(np.append(bounds, len(src))).max())
+        
+        walks = np.ones(self.n_total, dtype=np.int64)
+        for length in range(2, max_length + 1):
+            if walks.dtype != object and int(walks.max()) * max_out_degree >= 2 ** 62:
+                walks = walks.astype(object)
+            next_walks = np.zeros_like(walks)
+            next_walks[sources] = np.add.reduceat(walks[dst], bounds)
+            walks = next_walks
+            if length >= 3:
+                for start in starts:
+                    counts[names[start]][length] = int(walks[start])
+        return counts
+    
+    def _expand_paths(self, paths: List[Tuple[List[int], bool, object, Optional[Tuple[int, ...]]]],
+                      successors: Sequence[List[int]], step: Optional[Callable[[object, int], object]] = None,
+                      max_visits: Optional[int] = None, collapse_cycles: bool = False
+                      ) -> Iterator[Tuple[List[int], bool, object, Optional[Tuple[int, ...]], bool]]:
+        """
+        Extend every path by each real successor of its last node, in index order.
+        successors maps a node to its sorted successor list, as successor_index does.
+        Successors always exist in the graph, so validity of the extended path only
+        needs the new hop checked against the already-validated prefix. visits[k]
+        has a bit set for every node the path passed through more than k times.
+        """
+        for path, prefix_valid, state, visits in paths:
+            last_idx = path[-1]
+            for next_idx in successors[last_idx]:
+                next_visits = visits
+                extendable = True
+                if visits is not None:
+                    bit = 1 << next_idx
+                    if max_visits is not None and visits[-1] & bit:
+                        continue
+                    if collapse_cycles and visits[0] & bit:
+                        # A closed cycle comes out once: starting and ending at its
+                        # lowest-index node that can start a CPUX, with no lead-in
+                        if path[0] != next_idx or min(idx for idx in path if idx >= self.n_dn) != next_idx:
+                            continue
+                        extendable = False
+                    next_visits = self._add_visit(visits, bit)
+                next_state = state
+                if step is not None:
+                    next_state = step(state, next_idx)
+                    if next_state is None:
+                        continue
+                yield (path + [next_idx], prefix_valid and self._follows_pattern(last_idx, next_idx),
+                       next_state, next_visits, extendable)
+    
+    @staticmethod
+    def _add_visit(visits: Tuple[int, ...], bit: int) -> Tuple[int, ...]:
+        """Record one more visit of a node in the first layer that has not seen it yet"""
+        for layer, bits in enumerate(visits):
+            if not bits & bit:
+                return visits[:layer] + (bits | bit,) + visits[layer + 1:]
+        return visits
     
     def _convert_path_to_components(self, path: List[int]) -> List[str]:
         """Convert numeric path to component names"""
-        result = []
-        for idx in path:
-            if idx < self.n_dn:
-                result.append(self.design_nodes[idx])
-            elif idx < self.n_dn + self.n_i:
-                result.append(self.intentions[idx - self.n_dn])
-            else:
-                result.append(self.objects[idx - self.n_dn - self.n_i])
-        return result
+        names = self.node_names
+        return [names[idx] for idx in path]
+    
+    def decode_paths(self, paths: np.ndarray, pad: int = -1) -> List[List[str]]:
+        """Component names of every row of a padded (num_paths, max_len) index array"""
+        paths = np.asarray(paths)
+        keep = paths != pad
+        # One lookup over every real entry, row by row, then cut back into rows
+        names = self._name_array[paths[keep]].tolist()
+        ends = np.cumsum(keep.sum(axis=1)).tolist()
+        return [names[start:end] for start, end in zip([0] + ends[:-1], ends)]
+
+class ReachabilityIndex:
+    def __init__(self, successors: List[List[int]], rebuild_after: int = 32):
+        """
+        Answers "can node X reach node Y" over a CPUX transition graph with Python int
+        bitsets: the full transitive closure and its transpose (the nodes reaching
+        each node) are built over the SCC condensation, and hop-bounded closures
+        are built lazily one hop level at a time. successors must be the live lists
+        the new edges go into; edges wait until the next query, which folds them in
+        one by one or rebuilds everything once more than rebuild_after are pending.
+        """
+        self.successors = successors
+        self.n_total = len(successors)
+        self.rebuild_after = rebuild_after
+        self._pending: List[Tuple[int, int]] = []
+        self._closure: List[int] = []
+        self._reached_by: List[int] = []
+        self._levels: List[List[int]] = []  # _levels[k][u]: nodes reachable from u in 1..k+1 hops
+        self._stable = False  # True once the last level equals the full closure
+        self._build()
+        
+    def _build(self):
+        """Compute the closure of every node, forwards and backwards"""
+        predecessors: List[List[int]] = [[] for _ in range(self.n_total)]
+        for node, succ in enumerate(self.successors):
+            for nxt in succ:
+                predecessors[nxt].append(node)
+        self._closure = self._scc_closure(self.successors)
+        self._reached_by = self._scc_closure(predecessors)
+        self._levels = []
+        self._stable = False
+        
+    @staticmethod
+    def _scc_closure(successors: Sequence[List[int]]) -> List[int]:
+        """Closure bitset of every node of a graph with an iterative Tarjan SCC pass"""
+        n = len(successors)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        comp_of = [-1] * n
+        stack: List[int] = []
+        comps: List[List[int]] = []
+        counter = 0
+        
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            index[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, 0)]
+            while work:
+                node, pos = work[-1]
+                succ = successors[node]
+                if pos < len(succ):
+                    work[-1] = (node, pos + 1)
+                    nxt = succ[pos]
+                    if index[nxt] == -1:
+                        index[nxt] = low[nxt] = counter
+                        counter += 1
+                        stack.append(nxt)
+                        on_stack[nxt] = True
+                        work.append((nxt, 0))
+                    elif on_stack[nxt]:
+                        low[node] = min(low[node], index[nxt])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        comp_of[member] = len(comps)
+                        members.append(member)
+                        if member == node:
+                            break
+                    comps.append(members)
+                    
+        # Tarjan emits components sinks first, so successor components are always done
+        reach = [0] * len(comps)
+        for comp, members in enumerate(comps):
+            comp_bits = 0
+            for member in members:
+                comp_bits |= 1 << member
+            bits = 0
+            for member in members:
+                for nxt in successors[member]:
+                    if comp_of[nxt] == comp:
+                        bits |= comp_bits
+                    else:
+                        bits |= 1 << nxt | reach[comp_of[nxt]]
+            reach[comp] = bits
+        return [reach[comp_of[node]] for node in range(n)]
+        
+    @staticmethod
+    def _members(bits: int) -> Iterator[int]:
+        """Indices of the set bits, scanned in C over the binary digits"""
+        digits = bin(bits)[:1:-1]
+        pos = digits.find("1")
+        while pos != -1:
+            yield pos
+            pos = digits.find("1", pos + 1)
+        
+    def add_edge(self, src: int, dst: int):
+        """Note a new src -> dst transition, already in successors, for the next query"""
+        self._pending.append((src, dst))
+        
+    def _sync(self):
+        """Bring the closures up to date with the pending edges"""
+        pending, self._pending = self._pending, []
+        if len(pending) > self.rebuild_after:
+            self._build()
+            return
+        for src, dst in pending:
+            self._fold_edge(src, dst)
+        # A new edge can shorten paths, so hop levels are rebuilt on demand
+        self._levels = []
+        self._stable = False
+        
+    def _fold_edge(self, src: int, dst: int):
+        """
+        Fold one transition into the closures: src and every node reaching it gain
+        dst and all it reaches, and the other way round. Only those nodes are
+        touched, so an edge adding nothing new costs O(1).
+        """
+        closure, reached_by = self._closure, self._reached_by
+        gained = 1 << dst | closure[dst]
+        if closure[src] | gained != closure[src]:
+            sources = 1 << src | reached_by[src]
+            for node in self._members(sources):
+                closure[node] |= gained
+            for node in self._members(gained):
+                reached_by[node] |= sources
+        
+    def _level(self, max_hops: int) -> List[int]:
+        """Bitsets of nodes reachable in 1..max_hops transitions"""
+        if self._pending:
+            self._sync()
+        if not self._levels:
+            self._levels.append([sum(1 << nxt for nxt in succ) for succ in self.successors])
+        while len(self._levels) < max_hops and not self._stable:
+            first, last = self._levels[0], self._levels[-1]
+            level = []
+            for node, succ in enumerate(self.successors):
+                bits = first[node]
+                for nxt in succ:
+                    bits |= last[nxt]
+                level.append(bits)
+            self._stable = level == last
+            self._levels.append(level)
+        return self._levels[min(max_hops, len(self._levels)) - 1]
+    
+    def can_reach(self, src: int, dst: int, max_hops: Optional[int] = None) -> bool:
+        """Check if src leads to dst in at least one and at most max_hops transitions"""
+        if self._pending:
+            self._sync()
+        if max_hops is None:
+            return bool(self._closure[src] >> dst & 1)
+        if max_hops < 1:
+            return False
+        return bool(self._level(max_hops)[src] >> dst & 1)
+    
+    def reachable_from(self, src: int, max_hops: Optional[int] = None) -> List[int]:
+        """All nodes src leads to within max_hops transitions, in index order"""
+        if self._pending:
+            self._sync()
+        bits = self._closure[src] if max_hops is None else (self._level(max_hops)[src] if max_hops >= 1 else 0)
+        return [node for node in range(self.n_total) if bits >> node & 1]
+
+class CPUXStore:
+    COMPONENT_TYPES = NODE_TYPE_NAMES
+    
+    def __init__(self, generator: CPUXGenerator, nodes: np.ndarray, offsets: np.ndarray):
+        """
+        CPUXs stored CSR style: path k is nodes[offsets[k]:offsets[k + 1]], as node
+        indices of generator. Names and final PnRs are only looked up on access.
+        """
+        self.generator = generator
+        self.nodes = np.asarray(nodes, dtype=np.int32)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        
+    @classmethod
+    def from_index_paths(cls, generator: CPUXGenerator, paths: Iterable[List[int]]) -> 'CPUXStore':
+        """Build from numeric paths, appending into flat buffers without keeping the lists"""
+        nodes = array("i")
+        offsets = array("q", [0])
+        for path in paths:
+            nodes.extend(path)
+            offsets.append(len(nodes))
+        return cls(generator, np.frombuffer(nodes, dtype=np.int32), np.frombuffer(offsets, dtype=np.int64))
+    
+    @classmethod
+    def load(cls, file, generator: CPUXGenerator) -> 'CPUXStore':
+        """Read a store written by save, attaching it to the generator its indices refer to"""
+        with np.load(file) as data:
+            return cls(generator, data["nodes"], data["offsets"])
+    
+    def save(self, file):
+        """Write the node and offset arrays to an .npz file"""
+        np.savez(file, nodes=self.nodes, offsets=self.offsets)
+        
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, key):
+        """A CPUX as component names, or a new store for a slice"""
+        if isinstance(key, slice):
+            start, stop, stride = key.indices(len(self))
+            if stride == 1:
+                stop = max(start, stop)
+                offsets = self.offsets[start:stop + 1]
+                return CPUXStore(self.generator, self.nodes[offsets[0]:offsets[-1]], offsets - offsets[0])
+            return self.select(np.arange(start, stop, stride))
+        return self.generator._convert_path_to_components(self.path(key).tolist())
+    
+    def __iter__(self) -> Iterator[List[str]]:
+        for k in range(len(self)):
+            yield self[k]
+    
+    def path(self, k: int) -> np.ndarray:
+        """Node indices of CPUX k"""
+        if k < 0:
+            k += len(self)
+        if not 0 <= k < len(self):
+            raise IndexError(f"CPUX index {k} out of range for {len(self)} CPUXs")
+        return self.nodes[self.offsets[k]:self.offsets[k + 1]]
+    
+    def lengths(self) -> np.ndarray:
+        """Number of components of every CPUX"""
+        return np.diff(self.offsets)
+    
+    def select(self, indices) -> 'CPUXStore':
+        """New store holding the given CPUXs (indices or boolean mask) in the given order"""
+        indices = np.arange(len(self))[np.asarray(indices)]
+        lengths = self.lengths()[indices]
+        offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        gather = np.repeat(self.offsets[indices] - offsets[:-1], lengths) + np.arange(offsets[-1])
+        return CPUXStore(self.generator, self.nodes[gather], offsets)
+    
+    def contains(self, node_mask: np.ndarray) -> np.ndarray:
+        """Boolean mask of the CPUXs passing through at least one node where node_mask is set"""
+        hits = np.asarray(node_mask, dtype=bool)[self.nodes]
+        if len(self) == 0:
+            return np.zeros(0, dtype=bool)
+        return np.logical_or.reduceat(hits, self.offsets[:-1]) & (self.lengths() > 0)
+    
+    def filter_by_type(self, component_type: str, present: bool = True) -> 'CPUXStore':
+        """CPUXs that contain (or with present=False, lack) a component of type DN, I or O"""
+        if component_type not in self.COMPONENT_TYPES:
+            raise ValueError(f"Unknown component type {component_type!r}, expected DN, I or O")
+        mask = self.contains(self.generator.node_types == self.COMPONENT_TYPES.index(component_type))
+        return self.select(mask if present else ~mask)
+    
+    def final_pnr(self, k: int) -> 'PnRSet':
+        """Final PnR state of CPUX k, computed by the PnR generator on demand"""
+        return self.generator._calculate_final_pnr(self[k])
+    
+    def items(self) -> Iterator[Tuple[List[str], 'PnRSet']]:
+        """(cpux, final PnR) pairs as returned by get_feasible_cpuxs"""
+        for k in range(len(self)):
+            cpux = self[k]
+            yield cpux, self.generator._calculate_final_pnr(cpux)
 
 class PnRSet:
     def __init__(self, pnrs: Dict[str, Tuple[str, str]]):
@@ -142,6 +786,92 @@ class PnRSet:
                 if trivalence != other_trivalence:
                     return False
         return True
+    
+    def to_compact(self, interner: 'PromptInterner') -> 'CompactPnRSet':
+        """Convert to the interned bitset form"""
+        return CompactPnRSet.from_pnrs(interner, self.pnrs)
+
+# Two-bit trivalence codes stored across the hi/lo bitsets of a CompactPnRSet
+TRIVALENCE_CODES = {"Y": 1, "N": 2, "U": 3}
+TRIVALENCE_NAMES = {code: name for name, code in TRIVALENCE_CODES.items()}
+
+class PromptInterner:
+    def __init__(self):
+        """Map prompt strings to dense integer ids shared by compact PnR sets"""
+        self.ids: Dict[str, int] = {}
+        self.prompts: List[str] = []
+        
+    def intern(self, prompt: str) -> int:
+        """Get the id for a prompt, assigning the next free one if it is new"""
+        prompt_id = self.ids.get(prompt)
+        if prompt_id is None:
+            prompt_id = self.ids[prompt] = len(self.prompts)
+            self.prompts.append(prompt)
+        return prompt_id
+    
+    def __len__(self) -> int:
+        return len(self.prompts)
+
+class CompactPnRSet:
+    __slots__ = ("interner", "known", "hi", "lo", "responses", "_decoded")
+    
+    def __init__(self, interner: PromptInterner, known: int = 0, hi: int = 0, lo: int = 0,
+                 responses: Optional[Dict[int, str]] = None):
+        """
+        PnR set over interned prompt ids: bit k of known marks prompt k as present and
+        the same bit of hi/lo holds the two bits of its trivalence code. Responses are
+        kept aside, keyed by prompt id in insertion order, for converting back.
+        """
+        self.interner = interner
+        self.known = known
+        self.hi = hi
+        self.lo = lo
+        self.responses = responses if responses is not None else {}
+        self._decoded: Optional[Dict[str, Tuple[str, str]]] = None
+        
+    @classmethod
+    def from_pnrs(cls, interner: PromptInterner, pnrs: Dict[str, Tuple[str, str]]) -> 'CompactPnRSet':
+        """Build from the {"prompt": ("response", "trivalence")} dict form"""
+        compact = cls(interner)
+        for prompt, (response, trivalence) in pnrs.items():
+            code = TRIVALENCE_CODES.get(trivalence)
+            if code is None:
+                raise ValueError(f"Unknown trivalence {trivalence!r} for prompt {prompt!r}")
+            prompt_id = interner.intern(prompt)
+            bit = 1 << prompt_id
+            compact.known |= bit
+            compact.hi = compact.hi & ~bit | (bit if code & 2 else 0)
+            compact.lo = compact.lo & ~bit | (bit if code & 1 else 0)
+            compact.responses[prompt_id] = response
+        return compact
+    
+    def to_pnrset(self) -> PnRSet:
+        """Convert back to the dict form"""
+        # Sets are immutable once built and shared by many paths, so decode once
+        if self._decoded is None:
+            self._decoded = {}
+            for prompt_id, response in self.responses.items():
+                code = (self.hi >> prompt_id & 1) << 1 | (self.lo >> prompt_id & 1)
+                self._decoded[self.interner.prompts[prompt_id]] = (response, TRIVALENCE_NAMES[code])
+        return PnRSet(dict(self._decoded))
+    
+    def synctest(self, other: 'CompactPnRSet') -> bool:
+        """synctest as bit operations: prompts known to both must carry equal codes"""
+        return not ((self.hi ^ other.hi) | (self.lo ^ other.lo)) & self.known & other.known
+    
+    def overlay(self, other: 'CompactPnRSet', mask: int = -1) -> 'CompactPnRSet':
+        """Copy of this set with other's prompts written over it, limited to the mask bits"""
+        bits = other.known & mask
+        if not bits:
+            return self
+        responses = dict(self.responses)
+        for prompt_id, response in other.responses.items():
+            if bits >> prompt_id & 1:
+                responses[prompt_id] = response
+        return CompactPnRSet(self.interner, self.known | bits,
+                             self.hi & ~bits | other.hi & bits,
+                             self.lo & ~bits | other.lo & bits,
+                             responses)
 
 class Component:
     def __init__(self, name: str, gatekeeper: Optional[PnRSet] = None, 
@@ -151,11 +881,73 @@ class Component:
         self.flowin = flowin or PnRSet({})
         self.flowout = flowout or PnRSet({})
 
+class PnRStateCache:
+    """
+    Trie of (feasibility PnR, final PnR) states keyed by component-name prefixes,
+    so the state of a path comes from its parent's with one hop of work. The trie
+    is emptied whenever it holds max_nodes states, which bounds its memory.
+    """
+    def __init__(self, advance: Callable[[tuple, str], Optional[tuple]], initial_state: tuple,
+                 max_nodes: int = 1 << 16):
+        self._advance = advance
+        self._initial_state = initial_state
+        self.max_nodes = max_nodes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.clear()
+        
+    def clear(self):
+        """Drop every cached state, keeping the hit/miss counters"""
+        self._root: Tuple[dict, Optional[tuple]] = ({}, self._initial_state)
+        self.nodes = 1
+        
+    def lookup(self, path: List[str]) -> Tuple[Optional[tuple], int]:
+        """Return (state, failed_at); state is None when the gatekeeper at path[failed_at] fails"""
+        if self.nodes >= self.max_nodes:
+            self.clear()
+            self.evictions += 1
+        node = self._root
+        for depth, name in enumerate(path):
+            child = node[0].get(name)
+            if child is None:
+                self.misses += 1
+                child = ({}, self._advance(node[1], name))
+                node[0][name] = child
+                self.nodes += 1
+            else:
+                self.hits += 1
+            if child[1] is None:
+                return None, depth
+            node = child
+        return node[1], -1
+    
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counts per hop lookup, hit rate, trie size and how often the trie was emptied"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "nodes": self.nodes,
+            "evictions": self.evictions
+        }
+
 class CPUXGeneratorWithPnR(CPUXGenerator):
-    def __init__(self, intentions: List[str], objects: List[str], design_nodes: List[str]):
-        super().__init__(intentions, objects, design_nodes)
+    def __init__(self, intentions: List[str], objects: List[str], design_nodes: List[str],
+                 sparse: bool = False):
+        super().__init__(intentions, objects, design_nodes, sparse)
         self.components: Dict[str, Component] = {}
         
+        # Interned bitset copies of every component's PnR sets for the search hot paths
+        self.prompts = PromptInterner()
+        self._compact_components: Dict[str, Tuple[CompactPnRSet, CompactPnRSet, CompactPnRSet]] = {}
+        empty = CompactPnRSet(self.prompts)
+        self._empty_pnr_state = (empty, empty)
+        self._pnr_cache = PnRStateCache(self._advance_pnr, self._empty_pnr_state)
+        self._carried_hops = 0
+        self._pnr_arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]] = None
+        
     def add_component_pnr(self, component_name: str, 
                          gatekeeper: Optional[Dict[str, Tuple[str, str]]] = None,
                          flowin: Optional[Dict[str, Tuple[str, str]]] = None,
@@ -167,48 +959,196 @@ class CPUXGeneratorWithPnR(CPUXGenerator):
             PnRSet(flowin or {}),
             PnRSet(flowout or {})
         )
+        component = self.components[component_name]
+        self._compact_components[component_name] = (
+            component.gatekeeper.to_compact(self.prompts),
+            component.flowin.to_compact(self.prompts),
+            component.flowout.to_compact(self.prompts)
+        )
+        self._pnr_cache.clear()
+        self._pnr_arrays = None
+        
+    def pnr_cache_stats(self) -> Dict[str, float]:
+        """
+        Hit rate of the prefix PnR state cache behind feasibility and final PnR
+        lookups, plus carried_hops: states the unpruned search derived from the
+        state its parent path carried, without the cache
+        """
+        stats = self._pnr_cache.stats()
+        stats["carried_hops"] = self._carried_hops
+        return stats
         
     def is_feasible_path(self, path: List[str]) -> Tuple[bool, Optional[str]]:
         """Check if a path is feasible based on PnR constraints"""
-        current_pnr = PnRSet({})
-        
-        for i in range(len(path)):
-            component = self.components.get(path[i])
-            if not component:
-                continue
-                
-            # Check gatekeeper
-            if not component.gatekeeper.synctest(current_pnr):
-                return False, f"Gatekeeper check failed at {path[i]}"
-                
-            # Apply flowin
-            if component.flowin.pnrs:
-                for prompt, (response, trivalence) in component.flowin.pnrs.items():
-                    if prompt in current_pnr.pnrs:
-                        current_pnr.pnrs[prompt] = (response, trivalence)
-                        
-            # Apply flowout
-            if component.flowout.pnrs:
-                for prompt, (response, trivalence) in component.flowout.pnrs.items():
-                    current_pnr.pnrs[prompt] = (response, trivalence)
-                    
+        state, failed_at = self._pnr_cache.lookup(path)
+        if state is None:
+            return False, f"Gatekeeper check failed at {path[failed_at]}"
         return True, None
     
-    def get_feasible_cpuxs(self, max_length: int = 10) -> List[Tuple[List[str], PnRSet]]:
-        """Get all feasible CPUXs with their final PnR states"""
-        valid_cpuxs = self.get_valid_paths(max_length)
-        feasible_cpuxs = []
+    def pnr_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gatekeeper, flowin and flowout of every node as int8 arrays of shape
+        (n_total, n_prompts) holding trivalence codes, 0 where a prompt is absent
+        """
+        if self._pnr_arrays is None:
+            names = self.node_names
+            shape = (self.n_total, len(self.prompts))
+            arrays = tuple(np.zeros(shape, dtype=np.int8) for _ in range(3))
+            for idx, name in enumerate(names):
+                compact = self._compact_components.get(name)
+                if compact is None:
+                    continue
+                for array, pnr in zip(arrays, compact):
+                    for prompt_id in pnr.responses:
+                        array[idx, prompt_id] = (pnr.hi >> prompt_id & 1) << 1 | (pnr.lo >> prompt_id & 1)
+            self._pnr_arrays = arrays
+        return self._pnr_arrays
+    
+    def encode_paths(self, cpuxs: Iterable[List[str]], pad: int = -1) -> np.ndarray:
+        """Turn CPUXs given by component names into a padded (num_paths, max_len) index array"""
+        index = self.node_index
+        rows = [[index[name] for name in cpux] for cpux in cpuxs]
+        encoded = np.full((len(rows), max((len(row) for row in rows), default=0)), pad, dtype=np.int32)
+        for row, path in zip(encoded, rows):
+            row[:len(path)] = path
+        return encoded
+    
+    def check_paths_batch(self, paths: np.ndarray,
+                          pad: int = -1) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Feasibility check of many paths at once, one NumPy step per path position.
+        paths is a (num_paths, max_len) node index array padded at the end with pad.
+        Returns the feasible mask, the final trivalence codes (num_paths, n_prompts)
+        and the node whose flowout set each final prompt (-1 if none). Final codes
+        of infeasible paths stop at the failing gatekeeper.
+        """
+        paths = np.asarray(paths)
+        gatekeeper, flowin, flowout = self.pnr_arrays()
+        num_paths, max_len = paths.shape
+        feasible = np.ones(num_paths, dtype=bool)
+        current = np.zeros((num_paths, gatekeeper.shape[1]), dtype=np.int8)
+        final = np.zeros_like(current)
+        final_src = np.full(current.shape, -1, dtype=np.int32)
         
-        for cpux in valid_cpuxs:
-            feasible, reason = self.is_feasible_path(cpux)
-            if feasible:
-                final_pnr = self._calculate_final_pnr(cpux)
-                feasible_cpuxs.append((cpux, final_pnr))
-                
-        return feasible_cpuxs
+        for pos in range(max_len):
+            rows = np.flatnonzero(feasible & (paths[:, pos] != pad))
+            if rows.size == 0:
+                break
+            nodes = paths[rows, pos]
+            
+            # Gatekeeper synctest: prompts known on both sides must agree
+            state = current[rows]
+            gate = gatekeeper[nodes]
+            clash = ((gate != 0) & (state != 0) & (gate != state)).any(axis=1)
+            feasible[rows[clash]] = False
+            rows, nodes, state = rows[~clash], nodes[~clash], state[~clash]
+            
+            # Flowin overwrites prompts already present, flowout sets its prompts
+            incoming = flowin[nodes]
+            state = np.where((incoming != 0) & (state != 0), incoming, state)
+            outgoing = flowout[nodes]
+            written = outgoing != 0
+            current[rows] = np.where(written, outgoing, state)
+            final[rows] = np.where(written, outgoing, final[rows])
+            final_src[rows] = np.where(written, nodes[:, None], final_src[rows])
+            
+        return feasible, final, final_src
+    
+    def batch_final_pnr(self, final: np.ndarray, final_src: np.ndarray) -> PnRSet:
+        """Rebuild one path's final PnRSet from its row of check_paths_batch output, prompts in id order"""
+        names = self.node_names
+        pnrs = {}
+        for prompt_id in np.flatnonzero(final != 0):
+            prompt = self.prompts.prompts[prompt_id]
+            response = self.components[names[final_src[prompt_id]]].flowout.pnrs[prompt][0]
+            pnrs[prompt] = (response, TRIVALENCE_NAMES[int(final[prompt_id])])
+        return PnRSet(pnrs)
+    
+    def get_feasible_cpuxs(self, max_length: int = 10, prune: bool = False, max_visits: Optional[int] = None,
+                           collapse_cycles: bool = False, workers: Optional[int] = None,
+                           split_depth: int = 1, steal: bool = False) -> List[Tuple[List[str], PnRSet]]:
+        """
+        Get all feasible CPUXs with their final PnR states.
+        workers, split_depth and steal run the pruned search across a process pool as in get_valid_paths.
+        """
+        if workers is not None:
+            from parallelcpux import parallel_feasible_cpuxs
+            self._parallel_stats = {}
+            return parallel_feasible_cpuxs(self, max_length, workers, split_depth, max_visits,
+                                           collapse_cycles, steal, self._parallel_stats)
+        return list(self.iter_feasible_cpuxs(max_length, prune=prune, max_visits=max_visits,
+                                             collapse_cycles=collapse_cycles))
+    
+    def iter_feasible_cpuxs(self, max_length: int = 10, limit: Optional[int] = None, prune: bool = False,
+                            max_visits: Optional[int] = None, collapse_cycles: bool = False,
+                            order: str = "bfs") -> Iterator[Tuple[List[str], PnRSet]]:
+        """
+        Yield feasible CPUXs with their final PnR states in BFS order, stopping after limit.
+        With prune=True the PnR state travels with each frontier path and subtrees
+        are cut as soon as a gatekeeper synctest fails; the output is the same.
+        max_visits, collapse_cycles and order work as in iter_valid_paths; with
+        order="dfs" memory stays bounded in both modes.
+        """
+        if prune:
+            names = self.node_names
+            step = lambda state, idx: self._advance_pnr(state, names[idx])
+            paths = self._index_paths(max_length, step, self._empty_pnr_state,
+                                      max_visits, collapse_cycles, order)
+            feasible_cpuxs = (([names[idx] for idx in path], final.to_pnrset()) for path, (_, final) in paths)
+        else:
+            feasible_cpuxs = self._iter_cached_feasible(max_length, max_visits, collapse_cycles, order)
+        return islice(feasible_cpuxs, limit)
+    
+    def _iter_cached_feasible(self, max_length: int, max_visits: Optional[int] = None,
+                              collapse_cycles: bool = False, order: str = "bfs") -> Iterator[Tuple[List[str], PnRSet]]:
+        """
+        Filter valid CPUXs by a PnR state carried along the search without pruning.
+        Each path's state comes from its parent's with one hop of work, as in the
+        prefix cache, and lives only as long as the search keeps the path.
+        """
+        names = self.node_names
+        step = lambda state, idx: self._carry_pnr(state, names[idx])
+        for path, state in self._index_paths(max_length, step, self._empty_pnr_state,
+                                             max_visits, collapse_cycles, order):
+            if state is not False:
+                yield [names[idx] for idx in path], state[1].to_pnrset()
+    
+    def _carry_pnr(self, state, component_name: str):
+        """
+        Advance a state carried along the unpruned search by one hop; a failed
+        state becomes False rather than None so its subtree is still searched
+        """
+        if state is False:
+            return False
+        self._carried_hops += 1
+        return self._advance_pnr(state, component_name) or False
+    
+    def _advance_pnr(self, state: Tuple[CompactPnRSet, CompactPnRSet],
+                     component_name: str) -> Optional[Tuple[CompactPnRSet, CompactPnRSet]]:
+        """
+        Apply one component to a (feasibility PnR, final PnR) pair: gatekeeper synctest,
+        flowin onto prompts already present, then flowout. The final PnR only collects
+        flowouts. Returns None when the gatekeeper fails; unchanged sets are shared
+        between parent and child.
+        """
+        compact = self._compact_components.get(component_name)
+        if compact is None:
+            return state
+        gatekeeper, flowin, flowout = compact
+        current, final = state
+        
+        if not gatekeeper.synctest(current):
+            return None
+        current = current.overlay(flowin, current.known).overlay(flowout)
+        return current, final.overlay(flowout)
     
     def _calculate_final_pnr(self, path: List[str]) -> PnRSet:
         """Calculate the final PnR state for a path"""
+        state, _ = self._pnr_cache.lookup(path)
+        if state is not None:
+            return state[1].to_pnrset()
+        
+        # Infeasible paths stop early in the cache, so replay their flowouts
         current_pnr = PnRSet({})
         
         for component_name in path:
@@ -218,6 +1158,48 @@ class CPUXGeneratorWithPnR(CPUXGenerator):
                     current_pnr.pnrs[prompt] = (response, trivalence)
                     
         return current_pnr
+    
+    def get_categorized_cpuxs(self, max_length: int = 10, prune: bool = False, max_visits: Optional[int] = None,
+                              collapse_cycles: bool = False, as_store: bool = False
+                              ) -> Dict[str, Union[List[Tuple[List[str], PnRSet]], CPUXStore]]:
+        """
+        Get CPUXs categorized by design node presence
+        Returns:
+            Dictionary with two keys:
+            - 'with_dn': CPUXs containing at least one design node
+            - 'without_dn': CPUXs with no design nodes
+            With as_store=True each value is a CPUXStore instead of a list of
+            (cpux, final PnR) tuples; the pruned search fills it directly and
+            final PnRs are computed when read.
+        """
+        if as_store:
+            names = self.node_names
+            step = lambda state, idx: self._advance_pnr(state, names[idx])
+            paths = self._iter_index_paths(max_length, step, self._empty_pnr_state, max_visits, collapse_cycles)
+            store = CPUXStore.from_index_paths(self, (path for path, _ in paths))
+            # By name, as for lists: a node named like a design node counts as one
+            has_dn = store.contains(self.node_types[[self.node_index[name] for name in names]] == NODE_DN)
+            return {'with_dn': store.select(has_dn), 'without_dn': store.select(~has_dn)}
+        
+        categorized_cpuxs = {
+            'with_dn': [],
+            'without_dn': []
+        }
+        
+        types = self._type_codes
+        index = self.node_index
+        cpuxs = self.iter_feasible_cpuxs(max_length, prune=prune, max_visits=max_visits,
+                                         collapse_cycles=collapse_cycles)
+        for cpux, final_pnr in cpuxs:
+            # Check if CPUX contains any design nodes
+            has_dn = any(types[index[component]] == NODE_DN for component in cpux)
+            
+            if has_dn:
+                categorized_cpuxs['with_dn'].append((cpux, final_pnr))
+            else:
+                categorized_cpuxs['without_dn'].append((cpux, final_pnr))
+                
+        return categorized_cpuxs
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,499 @@
+import asyncio
+import inspect
+from collections import deque
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+def _as_list(intentions: Union[str, List[str], None]) -> List[str]:
+    """Registries give one intention string or a list of them"""
+    if intentions is None:
+        return []
+    if isinstance(intentions, str):
+        return [intentions]
+    return list(intentions)
+
+
+def pnrs_to_columns(pnrs: List[dict]) -> Dict[str, np.ndarray]:
+    """
+    Columnar view of PnR records of the demo form {"prompt": [value]}: one array
+    per prompt over all records, holding None where a record lacks the prompt.
+    Only values that are all scalars of one type get a typed array; any other
+    column is an object array holding the values unchanged.
+    """
+    keys: Dict[str, None] = {}
+    for pnr in pnrs:
+        keys.update(dict.fromkeys(pnr))
+    columns = {}
+    for key in keys:
+        values = [pnr[key][0] if key in pnr else None for pnr in pnrs]
+        if len({type(value) for value in values}) == 1 and np.isscalar(values[0]):
+            column = np.array(values)
+        else:
+            column = np.empty(len(values), dtype=object)
+            for k, value in enumerate(values):
+                column[k] = value
+        columns[key] = column
+    return columns
+
+
+def columns_to_pnrs(columns: Dict[str, object], n_records: int) -> List[dict]:
+    """
+    PnR records back from columns, each holding one value per record or a single
+    0-d value broadcast to every record; None values are left out
+    """
+    lists = {}
+    for key, column in columns.items():
+        if isinstance(column, (np.ndarray, np.generic)) and column.ndim == 0:
+            values = [column.item()] * n_records
+        elif isinstance(column, (list, tuple, np.ndarray)):
+            if len(column) != n_records:
+                raise ValueError(f"Column {key!r} holds {len(column)} values for {n_records} records")
+            # Typed arrays give back Python values; object arrays keep theirs as they are
+            typed = isinstance(column, np.ndarray) and column.dtype != object
+            values = column.tolist() if typed else list(column)
+        else:
+            values = [column] * n_records
+        lists[key] = values
+    pnrs = []
+    for k in range(n_records):
+        pnrs.append({key: [values[k]] for key, values in lists.items() if values[k] is not None})
+    return pnrs
+
+
+class IntentionRouter:
+    def __init__(self, objects: Dict[str, dict], design_nodes: Dict[str, dict],
+                 intentions: Optional[Dict[str, dict]] = None):
+        """
+        Routing table built once from the object and design node registries:
+        intention string -> every object and design node receiving it, in
+        registry order, plus the reverse map from intention string to its key
+        in the intentions registry when one is given
+        """
+        self.objects = objects
+        self.design_nodes = design_nodes
+        self._object_routes: Dict[str, List[Tuple[str, dict]]] = {}
+        self._node_routes: Dict[str, List[Tuple[str, dict]]] = {}
+        self._intention_keys: Dict[str, str] = {}
+
+        for name, obj in objects.items():
+            for intention in _as_list(obj.get("receives")):
+                self._object_routes.setdefault(intention, []).append((name, obj))
+        for name, node in design_nodes.items():
+            for intention in _as_list(node.get("receives")):
+                self._node_routes.setdefault(intention, []).append((name, node))
+        for key, intention in (intentions or {}).items():
+            self._intention_keys.setdefault(intention.get("string", key), key)
+
+    def objects_for(self, intention: str) -> List[Tuple[str, dict]]:
+        """(name, object) pairs receiving the intention"""
+        return self._object_routes.get(intention, [])
+
+    def design_nodes_for(self, intention: str) -> List[Tuple[str, dict]]:
+        """(name, design node) pairs receiving the intention"""
+        return self._node_routes.get(intention, [])
+
+    def intention_key(self, intention: str) -> str:
+        """Key of an intention string in the intentions registry"""
+        return self._intention_keys[intention]
+
+    @staticmethod
+    def emitted(node: dict) -> List[str]:
+        """Intentions a design node emits, whether it lists one or several"""
+        return _as_list(node.get("emits"))
+
+
+class Flow:
+    def __init__(self, flow_id: int, context: Optional[dict] = None):
+        """
+        One intention flow through the engine. context carries caller data such as
+        demo3's cpux_type; outputs collects (intention, payload) pairs emitted with
+        no receiver, which is where an acyclic flow ends.
+        """
+        self.flow_id = flow_id
+        self.context = dict(context or {})
+        self.hops = 0
+        self.pending = 0
+        self.outputs: List[Tuple[str, object]] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+
+
+class FlowEvent:
+    def __init__(self, kind: str, flow: Flow, intention: Optional[str] = None,
+                 name: Optional[str] = None, payload: object = None):
+        """
+        What subscribers see: kind is "object" (name received intention and passed
+        on payload), "design_node" (name received intention and produced payload),
+        "output" (intention had no receiver) or "flow_done" (check flow.error)
+        """
+        self.kind = kind
+        self.flow = flow
+        self.intention = intention
+        self.name = name
+        self.payload = payload
+
+
+class IntentionFlowEngine:
+    def __init__(self, objects: Dict[str, dict], design_nodes: Dict[str, dict],
+                 intentions: Optional[Dict[str, dict]] = None,
+                 branch: Optional[Callable[[Flow, str, List[str]], List[str]]] = None,
+                 max_hops: Optional[int] = None):
+        """
+        Headless executor of the object -> reflect -> design node -> emit cycle.
+        Emitted intentions wait on a FIFO queue and are processed as fast as step
+        is called, with no delays. branch(flow, node_name, intentions) may narrow
+        down what a design node emits; max_hops ends flows through cycles.
+        """
+        self.router = IntentionRouter(objects, design_nodes, intentions)
+        self.branch = branch
+        self.max_hops = max_hops
+        self.queue: deque = deque()
+        self.subscribers: List[Callable[[FlowEvent], None]] = []
+        self.flows_started = 0
+        self.flows_done = 0
+        
+    def subscribe(self, callback: Callable[[FlowEvent], None]):
+        """Call back with a FlowEvent for everything the engine does"""
+        self.subscribers.append(callback)
+        
+    def start_flow(self, intention: str, payload: object = None, context: Optional[dict] = None) -> Flow:
+        """Queue the first intention of a new flow"""
+        flow = Flow(self.flows_started, context)
+        self.flows_started += 1
+        self._emit(flow, intention, payload)
+        return flow
+    
+    def step(self) -> bool:
+        """Process one queued intention; False when the queue is empty"""
+        if not self.queue:
+            return False
+        flow, intention, payload = self.queue.popleft()
+        flow.pending -= 1
+        flow.hops += 1
+        receivers = self.router.objects_for(intention)
+        if not receivers and not self.router.design_nodes_for(intention):
+            flow.outputs.append((intention, payload))
+            self._publish("output", flow, intention, None, payload)
+        
+        for obj_name, obj in receivers:
+            reflected = self.reflect(obj, payload)
+            self._publish("object", flow, intention, obj_name, reflected)
+            for reflected_intention in _as_list(obj.get("reflects")):
+                self._run_design_nodes(flow, reflected_intention, reflected)
+        # Intentions may go straight to design nodes as well
+        self._run_design_nodes(flow, intention, payload)
+        
+        if flow.pending == 0 and not flow.done:
+            flow.done = True
+            self.flows_done += 1
+            self._publish("flow_done", flow)
+        return True
+    
+    def run(self, max_steps: Optional[int] = None) -> int:
+        """Step until the queue is empty or max_steps were taken; returns the steps taken"""
+        steps = 0
+        while (max_steps is None or steps < max_steps) and self.step():
+            steps += 1
+        return steps
+    
+    def advance(self) -> int:
+        """Process every intention queued so far: one hop of every active flow"""
+        return self.run(len(self.queue))
+    
+    @staticmethod
+    def reflect(obj: dict, payload: object) -> object:
+        """
+        Pass a payload through an object: PnR dicts are renamed by its pnr_mapping,
+        keys missing from the payload take the object's pnr_defaults or are dropped
+        """
+        mapping = obj.get("pnr_mapping")
+        if mapping is None or not isinstance(payload, dict):
+            return payload
+        defaults = obj.get("pnr_defaults", {})
+        mapped = {}
+        for in_key, out_key in mapping.items():
+            if in_key in payload:
+                mapped[out_key] = payload[in_key]
+            elif out_key in defaults:
+                mapped[out_key] = defaults[out_key]
+        return mapped
+    
+    @staticmethod
+    def process(node: dict, payload: object) -> object:
+        """Run a design node on a payload, preferring its process_pnr over its plain function"""
+        handler = node.get("process_pnr") or node.get("function")
+        return handler(payload) if handler else payload
+    
+    def _run_design_nodes(self, flow: Flow, intention: str, payload: object):
+        """Run the design nodes receiving an intention and queue what they emit"""
+        for node_name, node in self.router.design_nodes_for(intention):
+            result = self.process(node, payload)
+            self._publish("design_node", flow, intention, node_name, result)
+            emitted = self.router.emitted(node)
+            if self.branch is not None:
+                emitted = self.branch(flow, node_name, emitted)
+            for next_intention in emitted:
+                self._emit(flow, next_intention, result)
+    
+    def _emit(self, flow: Flow, intention: str, payload: object):
+        if self.max_hops is not None and flow.hops >= self.max_hops:
+            return
+        flow.pending += 1
+        self.queue.append((flow, intention, payload))
+    
+    def _publish(self, kind: str, flow: Flow, intention: Optional[str] = None,
+                 name: Optional[str] = None, payload: object = None):
+        if self.subscribers:
+            event = FlowEvent(kind, flow, intention, name, payload)
+            for callback in self.subscribers:
+                callback(event)
+
+
+class AsyncIntentionRuntime:
+    def __init__(self, objects: Dict[str, dict], design_nodes: Dict[str, dict],
+                 intentions: Optional[Dict[str, dict]] = None,
+                 branch: Optional[Callable[[Flow, str, List[str]], List[str]]] = None,
+                 max_hops: Optional[int] = None, max_concurrent: int = 1000, max_queued: int = 10000,
+                 offload: Union[bool, Executor] = False, batch_size: int = 1, batch_latency: float = 0.001):
+        """
+        asyncio counterpart of IntentionFlowEngine running many flows at once, each
+        with its own payloads and hop count. A flow's intentions are processed in
+        FIFO order by one of max_concurrent worker tasks; submit waits while
+        max_queued flows are already waiting to start. Coroutine design node
+        functions are awaited; plain ones run inline, or in a thread pool when
+        offload is True (the loop's default pool) or an Executor. With batch_size
+        above 1, design nodes that define process_pnr_batch get the PnRs of many
+        flows at once as columns (see pnrs_to_columns), a batch going out when it
+        is full or batch_latency seconds after its first record. Payloads that are
+        not PnR dicts go to process_pnr or function one at a time.
+        """
+        self.router = IntentionRouter(objects, design_nodes, intentions)
+        self.branch = branch
+        self.max_hops = max_hops
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        self.offload = offload
+        self.batch_size = batch_size
+        self.batch_latency = batch_latency
+        self.batches_run = 0
+        self.subscribers: List[Callable[[FlowEvent], None]] = []
+        self.flows_started = 0
+        self.flows_done = 0
+        self.active = 0
+        self.peak_active = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._batchers: Dict[int, '_MicroBatcher'] = {}
+        
+    def subscribe(self, callback: Callable[[FlowEvent], None]):
+        """Call back with a FlowEvent for everything the runtime does"""
+        self.subscribers.append(callback)
+        
+    def start(self):
+        """Start the worker tasks; needs a running event loop"""
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(self.max_queued)
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.max_concurrent)]
+        
+    async def submit(self, intention: str, payload: object = None, context: Optional[dict] = None) -> Flow:
+        """Queue a new flow, waiting while the queue is full; returns it right away, see join"""
+        self.start()
+        flow = Flow(self.flows_started, context)
+        self.flows_started += 1
+        await self._queue.put((flow, intention, payload))
+        return flow
+    
+    async def join(self):
+        """Wait until every submitted flow is done"""
+        if self._queue is not None:
+            await self._queue.join()
+            
+    async def close(self):
+        """Stop the worker tasks"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        
+    async def __aenter__(self) -> 'AsyncIntentionRuntime':
+        self.start()
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        if exc_info[0] is None:
+            await self.join()
+        await self.close()
+        
+    async def _worker(self):
+        while True:
+            flow, intention, payload = await self._queue.get()
+            self.active += 1
+            self.peak_active = max(self.peak_active, self.active)
+            try:
+                await self._execute(flow, intention, payload)
+            except Exception as error:
+                flow.error = error
+            finally:
+                self.active -= 1
+                flow.done = True
+                self.flows_done += 1
+                self._publish("flow_done", flow)
+                self._queue.task_done()
+                
+    async def _execute(self, flow: Flow, intention: str, payload: object):
+        """Run one flow to its end, the same hops IntentionFlowEngine.step would take"""
+        pending = deque([(intention, payload)])
+        while pending:
+            intention, payload = pending.popleft()
+            flow.hops += 1
+            receivers = self.router.objects_for(intention)
+            if not receivers and not self.router.design_nodes_for(intention):
+                flow.outputs.append((intention, payload))
+                self._publish("output", flow, intention, None, payload)
+                
+            for obj_name, obj in receivers:
+                reflected = IntentionFlowEngine.reflect(obj, payload)
+                self._publish("object", flow, intention, obj_name, reflected)
+                for reflected_intention in _as_list(obj.get("reflects")):
+                    await self._run_design_nodes(flow, reflected_intention, reflected, pending)
+            await self._run_design_nodes(flow, intention, payload, pending)
+            
+    async def _run_design_nodes(self, flow: Flow, intention: str, payload: object, pending: deque):
+        for node_name, node in self.router.design_nodes_for(intention):
+            result = await self.process(node, payload)
+            self._publish("design_node", flow, intention, node_name, result)
+            emitted = self.router.emitted(node)
+            if self.branch is not None:
+                emitted = self.branch(flow, node_name, emitted)
+            if self.max_hops is None or flow.hops < self.max_hops:
+                pending.extend((next_intention, result) for next_intention in emitted)
+                
+    async def process(self, node: dict, payload: object) -> object:
+        """
+        Run a design node's process_pnr or function, awaiting, offloading or batching
+        it as needed; only PnR dicts are batched, other payloads take the per-record path
+        """
+        if self.batch_size > 1 and "process_pnr_batch" in node and isinstance(payload, dict):
+            batcher = self._batchers.get(id(node))
+            if batcher is None:
+                batcher = self._batchers[id(node)] = _MicroBatcher(self, node["process_pnr_batch"])
+            return await batcher.submit(payload)
+        handler = node.get("process_pnr") or node.get("function")
+        if handler is None:
+            return payload
+        return await self._call(handler, payload)
+    
+    async def _call(self, handler: Callable, argument: object) -> object:
+        """Await a coroutine handler, run a plain one inline or in the thread pool"""
+        if inspect.iscoroutinefunction(handler):
+            return await handler(argument)
+        if self.offload:
+            executor = None if self.offload is True else self.offload
+            result = await asyncio.get_running_loop().run_in_executor(executor, handler, argument)
+        else:
+            result = handler(argument)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    
+    def _publish(self, kind: str, flow: Flow, intention: Optional[str] = None,
+                 name: Optional[str] = None, payload: object = None):
+        if self.subscribers:
+            event = FlowEvent(kind, flow, intention, name, payload)
+            for callback in self.subscribers:
+                callback(event)
+
+
+class _MicroBatcher:
+    def __init__(self, runtime: AsyncIntentionRuntime, handler: Callable[[Dict[str, np.ndarray]], Dict[str, object]]):
+        """Collects the PnRs reaching one batched design node and runs them through it together"""
+        self.runtime = runtime
+        self.handler = handler
+        self.pending: List[Tuple[object, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.tasks: set = set()
+        
+    def submit(self, pnr: dict) -> asyncio.Future:
+        """Future for the node's output on pnr, resolved when its batch has run"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((pnr, future))
+        if len(self.pending) >= self.runtime.batch_size:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.runtime.batch_latency, self.flush)
+        return future
+    
+    def flush(self):
+        """Send everything pending out as one batch"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+            
+    async def _run(self, batch: List[Tuple[object, asyncio.Future]]):
+        try:
+            columns = await self.runtime._call(self.handler, pnrs_to_columns([pnr for pnr, _ in batch]))
+            results = columns_to_pnrs(columns, len(batch))
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.runtime.batches_run += 1
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+# Example usage
+if __name__ == "__main__":
+    objects = {
+        "cloud": {"receives": "change_cloud_color", "reflects": "cloud_color_changed"},
+        "sky": {"receives": "change_cloud_color", "reflects": "sky_changed"}
+    }
+    design_nodes = {
+        "forecaster": {"receives": "cloud_color_changed", "emits": ["potential_storm", "potential_flood"]}
+    }
+    router = IntentionRouter(objects, design_nodes)
+    print("change_cloud_color ->", [name for name, _ in router.objects_for("change_cloud_color")])
+    for name, node in router.design_nodes_for("cloud_color_changed"):
+        print(f"cloud_color_changed -> {name} emits {router.emitted(node)}")
+    
+    # Run the demo1 cloud/mood cycle headless for a few rounds
+    objects = {
+        "cloud": {"receives": "change_cloud_color", "reflects": "cloud_color_changed"},
+        "mood": {"receives": "express_mood", "reflects": "mood_expressed"}
+    }
+    design_nodes = {
+        "color_processor": {"receives": "cloud_color_changed", "emits": "express_mood",
+                            "function": lambda color: "happy" if color == "blue" else "neutral"},
+        "mood_processor": {"receives": "mood_expressed", "emits": "change_cloud_color",
+                           "function": lambda mood: "blue" if mood == "happy" else "gray"}
+    }
+    engine = IntentionFlowEngine(objects, design_nodes, max_hops=6)
+    engine.subscribe(lambda event: print(f"  {event.kind:<11} {event.name or '':<15} {event.payload}"))
+    engine.start_flow("change_cloud_color", "blue")
+    print(f"{engine.run()} steps, {engine.flows_done} of {engine.flows_started} flows done")
+    
+    # The same registry with a coroutine design node, many flows at once
+    async def slow_color(mood):
+        await asyncio.sleep(0.01)
+        return "blue" if mood == "happy" else "gray"
+    design_nodes["mood_processor"]["function"] = slow_color
+    
+    async def main():
+        async with AsyncIntentionRuntime(objects, design_nodes, max_hops=6, max_concurrent=100) as runtime:
+            flows = [await runtime.submit("change_cloud_color", color) for color in ["blue", "gray"] * 500]
+        print(f"{runtime.flows_done} async flows done, at most {runtime.peak_active} at once, "
+              f"{sum(flow.hops for flow in flows)} hops")
+    asyncio.run(main())
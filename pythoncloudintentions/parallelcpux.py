@@ -0,0 +1,312 @@
+import os
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from genwithpnr import CPUXGeneratorWithPnR, PnRSet
+
+# Per-process search generator, rebuilt once by _init_worker, and the shared
+# blocks its successors are read from, attached for the worker's lifetime
+_worker_generator: Optional[CPUXGeneratorWithPnR] = None
+_worker_blocks: List[shared_memory.SharedMemory] = []
+
+
+def _share_array(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, Tuple[str, Tuple[int, ...], str]]:
+    """Copy an array into a new shared memory block; returns the block and how to attach to it"""
+    block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+    return block, (block.name, array.shape, array.dtype.str)
+
+
+def _attach_array(spec: Tuple[str, Tuple[int, ...], str]) -> np.ndarray:
+    """View of a shared array; the block stays attached until the worker exits"""
+    name, shape, dtype = spec
+    block = shared_memory.SharedMemory(name=name)
+    _worker_blocks.append(block)
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+
+
+class _CSRSuccessors:
+    """Successor lists read from CSR arrays in place: node k's are indices[indptr[k]:indptr[k + 1]]"""
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray):
+        self.indptr = indptr
+        self.indices = indices
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    def __getitem__(self, k: int) -> List[int]:
+        # Python ints, since visit bitsets shift by node index past 64 bits
+        return self.indices[self.indptr[k]:self.indptr[k + 1]].tolist()
+
+
+def _init_worker(names: Tuple[List[str], List[str], List[str]], indptr_spec, indices_spec,
+                 prompts: List[str], components: Dict[str, Tuple[dict, dict, dict]]):
+    """Rebuild the generator inside a worker over the shared CSR arrays and the PnR registry"""
+    global _worker_generator
+    intentions, objects, design_nodes = names
+    generator = CPUXGeneratorWithPnR(intentions, objects, design_nodes, sparse=True)
+    generator.successors = _CSRSuccessors(_attach_array(indptr_spec), _attach_array(indices_spec))
+
+    # Same prompt ids as the parent, so final PnRs decode identically
+    for prompt in prompts:
+        generator.prompts.intern(prompt)
+    for name, (gatekeeper, flowin, flowout) in components.items():
+        generator.add_component_pnr(name, gatekeeper, flowin, flowout)
+    _worker_generator = generator
+
+
+def _search_step(generator: CPUXGeneratorWithPnR, feasible: bool):
+    """Step function and initial state of the PnR-pruned search, or (None, None) for structural search"""
+    if not feasible:
+        return None, None
+    names = generator.node_names
+    return (lambda state, idx: generator._advance_pnr(state, names[idx])), generator._empty_pnr_state
+
+
+def _final_pnrs(state) -> Optional[dict]:
+    """Final PnR dict carried by a search state"""
+    return None if state is None else state[1].to_pnrset().pnrs
+
+
+def _explore(roots: List[List[int]], max_length: int, feasible: bool, max_visits: Optional[int],
+             collapse_cycles: bool) -> Tuple[List[Tuple[List[int], Optional[dict]]], Tuple[int, int, int, float]]:
+    """
+    Enumerate every path below a chunk of equal-length roots in BFS order, with the
+    final PnR dict when feasible; also returns (pid, paths explored, paths found,
+    busy seconds)
+    """
+    started = time.perf_counter()
+    generator = _worker_generator
+    step, initial_state = _search_step(generator, feasible)
+    explored: List[int] = []
+    paths = generator._iter_index_paths(max_length, step, initial_state, max_visits,
+                                        collapse_cycles, roots=roots, explored=explored)
+    found = [(path, _final_pnrs(state)) for path, state in paths]
+    return found, (os.getpid(), explored[0], len(found), time.perf_counter() - started)
+
+
+def _explore_budget(roots: List[List[int]], max_length: int, feasible: bool, max_visits: Optional[int],
+                    collapse_cycles: bool, budget: int
+                    ) -> Tuple[List[Tuple[List[int], Optional[dict]]], List[List[int]], Tuple[int, int, int, float]]:
+    """
+    Depth-first search below the roots that stops after budget extensions.
+    Returns the paths found, the prefixes left unexplored (to be handed to other
+    workers) and (pid, paths explored, paths found, busy seconds).
+    """
+    started = time.perf_counter()
+    generator = _worker_generator
+    step, initial_state = _search_step(generator, feasible)
+    layers = 0
+    if max_visits is not None or collapse_cycles:
+        layers = max_visits or 1
+    stack = []
+    for root in reversed(roots):
+        entry = generator._root_entry(root, step, initial_state, layers)
+        if entry is not None:
+            stack.append(entry)
+
+    successors = generator.successor_index()
+    found = []
+    explored = 0
+    while stack and explored < budget:
+        entry = stack.pop()
+        if len(entry[0]) >= max_length:
+            continue
+        children = []
+        for new_path, prefix_valid, state, visits, extendable in generator._expand_paths(
+                [entry], successors, step, max_visits, collapse_cycles):
+            explored += 1
+            if prefix_valid and len(new_path) >= 3:
+                found.append((new_path, _final_pnrs(state)))
+            if extendable:
+                children.append((new_path, prefix_valid, state, visits))
+        stack.extend(reversed(children))
+    leftover = [entry[0] for entry in reversed(stack)]
+    return found, leftover, (os.getpid(), explored, len(found), time.perf_counter() - started)
+
+
+class _WorkerPool:
+    """Process pool whose workers share the generator's transitions and PnR registry"""
+
+    def __init__(self, generator, workers: int):
+        indptr, indices = generator.to_csr()
+        indptr_block, indptr_spec = _share_array(indptr)
+        indices_block, indices_spec = _share_array(indices)
+        self.blocks = [indptr_block, indices_block]
+        components = {}
+        prompts = []
+        if isinstance(generator, CPUXGeneratorWithPnR):
+            components = {name: (c.gatekeeper.pnrs, c.flowin.pnrs, c.flowout.pnrs)
+                          for name, c in generator.components.items()}
+            prompts = generator.prompts.prompts
+        initargs = ((generator.intentions, generator.objects, generator.design_nodes),
+                    indptr_spec, indices_spec, prompts, components)
+        self.executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs)
+
+    def __enter__(self) -> ProcessPoolExecutor:
+        return self.executor
+
+    def __exit__(self, *exc_info):
+        self.executor.shutdown()
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+
+def _worker_stats(metrics: List[Tuple[int, int, int, float]], wall: float) -> Dict[int, Dict[str, float]]:
+    """Per-worker tasks, paths explored and found, busy and idle seconds, keyed by worker pid"""
+    stats: Dict[int, Dict[str, float]] = {}
+    for pid, explored, found, busy in metrics:
+        worker = stats.setdefault(pid, {"tasks": 0, "paths": 0, "found": 0, "busy": 0.0, "idle": 0.0})
+        worker["tasks"] += 1
+        worker["paths"] += explored
+        worker["found"] += found
+        worker["busy"] += busy
+    for worker in stats.values():
+        worker["idle"] = max(wall - worker["busy"], 0.0)
+    return stats
+
+
+def _run_static(generator, roots: List[List[int]], max_length: int, workers: int, feasible: bool,
+                max_visits: Optional[int], collapse_cycles: bool, stats: Dict[int, Dict[str, float]]):
+    """One pass over contiguous chunks of roots, merged length by length in chunk order"""
+    chunk_size = -(-len(roots) // (workers * 4))
+    chunks = [roots[k:k + chunk_size] for k in range(0, len(roots), chunk_size)]
+    started = time.perf_counter()
+    with _WorkerPool(generator, min(workers, len(chunks))) as pool:
+        futures = [pool.submit(_explore, chunk, max_length, feasible, max_visits, collapse_cycles)
+                   for chunk in chunks]
+        chunk_results = [future.result() for future in futures]
+    stats.update(_worker_stats([metrics for _, metrics in chunk_results], time.perf_counter() - started))
+
+    # Within a chunk paths arrive in BFS order; across chunks, prefixes are in order
+    by_length: Dict[int, List[Tuple[List[int], Optional[dict]]]] = defaultdict(list)
+    for found, _ in chunk_results:
+        for entry in found:
+            by_length[len(entry[0])].append(entry)
+    return [entry for length in sorted(by_length) for entry in by_length[length]]
+
+
+def _run_stealing(generator, roots: List[List[int]], max_length: int, workers: int, feasible: bool,
+                  max_visits: Optional[int], collapse_cycles: bool, budget: int,
+                  stats: Dict[int, Dict[str, float]]):
+    """
+    Budgeted tasks fed from a central queue of prefixes. A task that runs out of
+    budget sends its unexplored prefixes back, and whichever worker is idle next
+    picks them up, so a hub subtree ends up spread over the whole pool. Chunks
+    are the queue split across twice the pool size, so they shrink as it drains.
+    """
+    queue = deque(roots)
+    found = []
+    metrics = []
+    started = time.perf_counter()
+    with _WorkerPool(generator, workers) as pool:
+        pending = set()
+        while queue or pending:
+            while queue and len(pending) < workers * 2:
+                chunk_size = max(1, len(queue) // (workers * 2))
+                chunk = [queue.popleft() for _ in range(min(chunk_size, len(queue)))]
+                pending.add(pool.submit(_explore_budget, chunk, max_length, feasible,
+                                        max_visits, collapse_cycles, budget))
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                task_found, leftover, task_metrics = future.result()
+                found.extend(task_found)
+                queue.extend(leftover)
+                metrics.append(task_metrics)
+    stats.update(_worker_stats(metrics, time.perf_counter() - started))
+
+    # Tasks finish in any order; the serial BFS order is by length, then index order
+    found.sort(key=lambda entry: (len(entry[0]), entry[0]))
+    return found
+
+
+def parallel_index_paths(generator, max_length: int, workers: Optional[int] = None, split_depth: int = 1,
+                         feasible: bool = False, max_visits: Optional[int] = None,
+                         collapse_cycles: bool = False, steal: bool = False, budget: int = 20000,
+                         stats: Optional[Dict[int, Dict[str, float]]] = None
+                         ) -> List[Tuple[List[int], Optional[dict]]]:
+    """
+    Enumerate valid (or feasible) index paths across a process pool.
+    The frontier is expanded serially to split_depth nodes, then every prefix left
+    becomes a unit of work. Workers get the transitions through shared memory.
+    By default chunks of prefixes are handed out once and merged length by length
+    in chunk order; with steal=True tasks stop after budget extensions and return
+    what they did not explore to a shared queue (see _run_stealing). Either way
+    the result is the serial BFS order exactly. Per-worker metrics go into stats.
+    """
+    if split_depth < 1:
+        raise ValueError(f"split_depth must be at least 1, got {split_depth}")
+    if budget < 1:
+        raise ValueError(f"budget must be at least 1, got {budget}")
+    workers = workers or os.cpu_count() or 1
+    stats = {} if stats is None else stats
+    step, initial_state = _search_step(generator, feasible)
+
+    # Paths up to split_depth come from the serial pass, its frontier is the work
+    roots: List[List[int]] = []
+    head = generator._iter_index_paths(min(split_depth, max_length), step, initial_state,
+                                       max_visits, collapse_cycles, frontier=roots)
+    results = [(path, _final_pnrs(state)) for path, state in head]
+    if max_length <= split_depth or not roots:
+        return results
+
+    if steal:
+        results.extend(_run_stealing(generator, roots, max_length, workers, feasible,
+                                     max_visits, collapse_cycles, budget, stats))
+    else:
+        results.extend(_run_static(generator, roots, max_length, workers, feasible,
+                                   max_visits, collapse_cycles, stats))
+    return results
+
+
+def parallel_valid_paths(generator, max_length: int = 10, workers: Optional[int] = None,
+                         split_depth: int = 1, max_visits: Optional[int] = None,
+                         collapse_cycles: bool = False, steal: bool = False,
+                         stats: Optional[Dict[int, Dict[str, float]]] = None) -> List[List[str]]:
+    """get_valid_paths across a process pool, same result"""
+    paths = parallel_index_paths(generator, max_length, workers, split_depth, False,
+                                 max_visits, collapse_cycles, steal, stats=stats)
+    return [generator._convert_path_to_components(path) for path, _ in paths]
+
+
+def parallel_feasible_cpuxs(generator: CPUXGeneratorWithPnR, max_length: int = 10,
+                            workers: Optional[int] = None, split_depth: int = 1,
+                            max_visits: Optional[int] = None, collapse_cycles: bool = False,
+                            steal: bool = False, stats: Optional[Dict[int, Dict[str, float]]] = None
+                            ) -> List[Tuple[List[str], PnRSet]]:
+    """get_feasible_cpuxs across a process pool, same result"""
+    paths = parallel_index_paths(generator, max_length, workers, split_depth, True,
+                                 max_visits, collapse_cycles, steal, stats=stats)
+    return [(generator._convert_path_to_components(path), PnRSet(pnrs)) for path, pnrs in paths]
+
+
+# Example usage
+if __name__ == "__main__":
+    generator = CPUXGeneratorWithPnR(["i1", "i2", "i3"], ["o1", "o2", "o3"], ["dn1", "dn2"])
+    generator.add_ioi_trio(0, 0, 1)  # i1-o1-i2
+    generator.add_ioi_trio(1, 1, 2)  # i2-o2-i3
+    generator.add_idni_trio(1, 0, 2)  # i2-dn1-i3
+    generator.add_component_pnr("o1", flowout={"status": ("Ready", "Y")})
+    generator.add_component_pnr("dn1", gatekeeper={"status": ("Ready", "Y")},
+                                flowout={"result": ("Done", "Y")})
+
+    serial = generator.get_feasible_cpuxs(6)
+    parallel = generator.get_feasible_cpuxs(6, workers=2)
+    print(f"{len(parallel)} feasible CPUXs, identical to serial: "
+          f"{[(c, p.pnrs) for c, p in serial] == [(c, p.pnrs) for c, p in parallel]}")
+    stolen = generator.get_feasible_cpuxs(6, workers=2, steal=True)
+    print(f"Work-stealing schedule identical too: "
+          f"{[(c, p.pnrs) for c, p in serial] == [(c, p.pnrs) for c, p in stolen]}")
+    for pid, worker in generator.parallel_stats().items():
+        print(f"  worker {pid}: {worker['tasks']} tasks, {worker['paths']} paths explored, "
+              f"{worker['found']} found, "
+              f"idle {worker['idle']:.3f}s")
+    for cpux, final_pnr in parallel:
+        print(" -> ".join(cpux), final_pnr.pnrs)